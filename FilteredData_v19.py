@@ -2,262 +2,300 @@ import streamlit as st
 import pandas as pd
 from datetime import datetime
 import plotly.express as px
-from tkinter import Tk
-from tkinter.filedialog import askopenfilename
 import os
+import time
 import numpy as np
-import base64
-from PIL import Image
-import io
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter, landscape
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image as RLImage, PageBreak
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-import tempfile
-import plotly.io as pio
-from scipy.stats import norm
 import plotly.graph_objects as go
-from scipy.stats import t
+from signal_analyzer.data_loader import load_dataframe, list_sheets, content_digest, get_footprint
+from signal_analyzer.filters import FILTER_LETTERS, FilteredView, column_values, evaluate_filters, probability_chain, range_filter, values_filter
+from signal_analyzer.column_summary import cached_metrics, cached_summary, cached_summaries
+from signal_analyzer.report_charts import DEFAULT_CHART_DPI
+from signal_analyzer.pdf_report import build_pdf_report
+from signal_analyzer.report_jobs import report_jobs
+from signal_analyzer.profiling import RunProfile
+from signal_analyzer.assets import asset_base64, asset_png, resolve_asset
+from signal_analyzer.monte_carlo import simulate_monte_carlo, simulate_monte_carlo_streaming, simulate_monte_carlo_parallel, summarize_trajectories
 
 # Create tabs
 # tab1, tab2 = st.tabs(["Signal Analyzer", "Monte Carlo Analysis"])
 
-# Check if file_path is already in session state
-if 'file_path' not in st.session_state:
-    st.session_state.file_path = None
-
-# Initialize show_table in session state
-if 'show_table' not in st.session_state:
-    st.session_state.show_table = False
-
-# Function to create PDF report
-def create_pdf_report(df_filtered2, metrics_data1, metrics_data2, selected_column1, selected_column2, chart_columns):
-    try:
-        st.text('Creating temporary directory...')
-        # Create a temporary directory for images
-        temp_dir = tempfile.mkdtemp()
-        st.text(f'Temporary directory created at: {temp_dir}')
-        
-        st.text('Creating temporary file...')
-        # Create a temporary file for the PDF
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp_file:
-            pdf_path = tmp_file.name
+# Function to show the file uploader (server.maxUploadSize in .streamlit/config.toml caps the size)
+def upload_data_file(key):
+    return st.file_uploader(
+        'Select data file',
+        type=['xlsx', 'xlsm', 'csv', 'parquet'],
+        key=key,
+        help=f"Excel, CSV or Parquet, up to {st.get_option('server.maxUploadSize')} MB"
+    )
+
+# Function to keep a new upload in session state; the bytes are hashed once per upload, not per rerun
+def store_uploaded_file(uploaded_file):
+    if uploaded_file is None or uploaded_file.file_id == st.session_state.file_id:
+        return False
+    data = uploaded_file.getvalue()
+    st.session_state.file_id = uploaded_file.file_id
+    st.session_state.file_name = uploaded_file.name
+    st.session_state.file_data = data
+    st.session_state.file_digest = content_digest(data)
+    return True
+
+# Function to render the widgets of filter number i and return its filter spec (None if it selects every row)
+def render_filter(df, i):
+    # Dropdown to select the filter header
+    filter_header = st.selectbox(f'Select the header to filter {i}', df.columns, key=f'filter_header_{i}')
+
+    if pd.api.types.is_datetime64_any_dtype(df[filter_header]):
+        min_date = df[filter_header].min()
+        max_date = df[filter_header].max()
+        date_range = st.date_input(f'Select the date range for "{filter_header}"', [min_date, max_date],
+                                   key=f'date_range_{i}_{filter_header}')
+        if len(date_range) == 2:
+            start_date = datetime.combine(date_range[0], datetime.min.time())
+            end_date = datetime.combine(date_range[1], datetime.min.time())
+            return range_filter(filter_header, start_date, end_date)
+        return None
+    elif pd.api.types.is_numeric_dtype(df[filter_header]):
+        min_value = float(round(df[filter_header].min(), 2))
+        max_value = float(round(df[filter_header].max(), 2))
         
-        st.text('Initializing PDF document...')
-        # Create the PDF document with A4 size
-        from reportlab.lib.pagesizes import A4
-        doc = SimpleDocTemplate(pdf_path, pagesize=A4)
-        styles = getSampleStyleSheet()
-        elements = []
-        
-        st.text('Adding title...')
-        # Add title
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=20,  # Reduced font size for A4
-            spaceAfter=20,
-            alignment=1  # Center alignment
-        )
-        elements.append(Paragraph("Signal Analyzer Report", title_style))
+        # Initialize session state if not exists
+        if f'number_min_{i}_{filter_header}' not in st.session_state:
+            st.session_state[f'number_min_{i}_{filter_header}'] = min_value
+        if f'number_max_{i}_{filter_header}' not in st.session_state:
+            st.session_state[f'number_max_{i}_{filter_header}'] = max_value
+        if f'range_slider_{i}_{filter_header}' not in st.session_state:
+            st.session_state[f'range_slider_{i}_{filter_header}'] = (min_value, max_value)
         
-        st.text('Creating filter information table...')
-        # Create a table for filter information
-        filter_data = [
-            ["Filter Information", ""],
-            ["Filter 1", selected_column1],
-            ["Total Records", str(len(df_filtered2))],
-            ["P(A)", f"{(len(df_filtered2)/len(df))*100:.2f}%"],
-            ["Filter 2", selected_column2],
-            ["P(B)", f"{(len(df_filtered2)/len(df))*100:.2f}%"],
-            ["P(B|A)", f"{(len(df_filtered2)/len(df_filtered2))*100:.2f}%"]
-        ]
+        # Callback functions keeping the number inputs and the slider in sync
+        def update_slider():
+            st.session_state[f'range_slider_{i}_{filter_header}'] = (
+                st.session_state[f'number_min_{i}_{filter_header}'],
+                st.session_state[f'number_max_{i}_{filter_header}']
+            )
+
+        def update_inputs():
+            st.session_state[f'number_min_{i}_{filter_header}'] = st.session_state[f'range_slider_{i}_{filter_header}'][0]
+            st.session_state[f'number_max_{i}_{filter_header}'] = st.session_state[f'range_slider_{i}_{filter_header}'][1]
         
-        filter_table = Table(filter_data, colWidths=[150, 250])  # Adjusted widths for A4
-        filter_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 12),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 1), (-1, -1), 10),
-            ('TOPPADDING', (0, 1), (-1, -1), 6),
-            ('BOTTOMPADDING', (0, 1), (-1, -1), 6),
-        ]))
-        elements.append(filter_table)
-        elements.append(Spacer(1, 20))
+        col_min, col_max = st.columns(2)
         
-        st.text('Adding metrics tables...')
-        # Add metrics tables side by side
-        if metrics_data1 and metrics_data2:
-            # Create data for both tables
-            metrics_table_data1 = [
-                [Paragraph(f"Metrics for {selected_column1}", styles['Heading3']), ""],
-                ["Win Rate", f"{metrics_data1['win_rate']:.2f}%"],
-                ["Net Win", f"{metrics_data1['net_win']:.2f} R"],
-                ["Total Win", f"{metrics_data1['total_win']:.2f} R"],
-                ["Total Loss", f"{metrics_data1['total_loss']:.2f} R"],
-                ["SQN", f"{metrics_data1['sqn']:.2f}"],
-                ["StdDev", f"{metrics_data1['std_dev']:.2f}"],
-                ["Median R", f"{metrics_data1['median_r']:.2f}"],
-                ["Mode", f"{metrics_data1['mode_r']:.2f}"],
-                ["Avrg R", f"{metrics_data1['avg_r']:.2f}"]
-            ]
-            
-            metrics_table_data2 = [
-                [Paragraph(f"Metrics for {selected_column2}", styles['Heading3']), ""],
-                ["Win Rate", f"{metrics_data2['win_rate']:.2f}%"],
-                ["Net Win", f"{metrics_data2['net_win']:.2f} R"],
-                ["Total Win", f"{metrics_data2['total_win']:.2f} R"],
-                ["Total Loss", f"{metrics_data2['total_loss']:.2f} R"],
-                ["SQN", f"{metrics_data2['sqn']:.2f}"],
-                ["StdDev", f"{metrics_data2['std_dev']:.2f}"],
-                ["Median R", f"{metrics_data2['median_r']:.2f}"],
-                ["Mode", f"{metrics_data2['mode_r']:.2f}"],
-                ["Avrg R", f"{metrics_data2['avg_r']:.2f}"]
-            ]
-            
-            # Create tables
-            table_style = TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 10),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black),
-                ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-                ('FONTSIZE', (0, 1), (-1, -1), 9),
-            ])
-            
-            table1 = Table(metrics_table_data1, colWidths=[120, 80])  # Adjusted widths for A4
-            table1.setStyle(table_style)
-            table2 = Table(metrics_table_data2, colWidths=[120, 80])  # Adjusted widths for A4
-            table2.setStyle(table_style)
-            
-            # Create a table to hold both metrics tables side by side
-            combined_table = Table([[table1, table2]], colWidths=[250, 250])  # Adjusted widths for A4
-            combined_table.setStyle(TableStyle([
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-            ]))
-            elements.append(combined_table)
+        with col_min:
+            condition_min = st.selectbox('Condition (Min)', ['Greater than or equal to', 'Greater than'], key=f'condition_min_{i}')
+            st.number_input(
+                f'Value ({min_value:.2f} : {max_value:.2f})', 
+                min_value=float(min_value),
+                max_value=float(max_value),
+                key=f'number_min_{i}_{filter_header}',
+                on_change=update_slider
+            )
         
-        st.text('Adding page break...')
-        # Add page break before histograms
-        elements.append(PageBreak())
+        with col_max:
+            condition_max = st.selectbox('Condition (Max)', ['Less than or equal to', 'Less than'], key=f'condition_max_{i}')
+            st.number_input(
+                f'Value ({min_value:.2f} : {max_value:.2f})', 
+                min_value=float(min_value),
+                max_value=float(max_value),
+                key=f'number_max_{i}_{filter_header}',
+                on_change=update_slider
+            )
         
-        st.text('Adding histograms title...')
-        # Add histograms title
-        elements.append(Paragraph("Histograms", title_style))
-        elements.append(Spacer(1, 20))
-        
-        st.text('Generating histograms...')
-        # Create histograms (2 per row)
-        for i in range(0, len(chart_columns), 2):
-            hist_row = []
-            for j in range(2):
-                if i + j < len(chart_columns):
-                    column = chart_columns[i + j]
-                    if pd.api.types.is_numeric_dtype(df_filtered2[column]):
-                        try:
-                            st.text(f'Generating histogram for {column}...')
-                            
-                            # Create a simple histogram using matplotlib
-                            import matplotlib.pyplot as plt
-                            import io
-                            import re
-                            
-                            # Clean column name for file name
-                            safe_column_name = re.sub(r'[<>:"/\\|?*]', '_', column)
-                            
-                            plt.figure(figsize=(6, 3))  # Adjusted size for A4
-                            plt.hist(df_filtered2[column].dropna(), bins=30, edgecolor='black')
-                            plt.title(f'Distribution of "{column}"', fontsize=10)
-                            plt.xlabel('Value', fontsize=8)
-                            plt.ylabel('Frequency', fontsize=8)
-                            plt.xticks(fontsize=7)
-                            plt.yticks(fontsize=7)
-                            
-                            # Save plot to a bytes buffer
-                            buf = io.BytesIO()
-                            plt.savefig(buf, format='png', bbox_inches='tight', dpi=300)
-                            plt.close()
-                            
-                            # Convert buffer to image
-                            buf.seek(0)
-                            img = Image.open(buf)
-                            
-                            # Save to temporary file in the temp directory
-                            img_path = os.path.join(temp_dir, f"temp_histogram_{safe_column_name}.png")
-                            img.save(img_path)
-                            
-                            # Add image to row with adjusted size for A4
-                            hist_row.append(RLImage(img_path, width=250, height=150))
-                            
-                            # Clean up buffer
-                            buf.close()
-                            
-                        except Exception as e:
-                            st.error(f"Error generating histogram for {column}: {str(e)}")
-                            continue
-            
-            if hist_row:
-                # Add spacer if only one histogram in row
-                if len(hist_row) == 1:
-                    hist_row.append(Spacer(250, 150))
-                
-                # Create table for histogram row
-                hist_table = Table([hist_row], colWidths=[250, 250])  # Adjusted widths for A4
-                hist_table.setStyle(TableStyle([
-                    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-                ]))
-                elements.append(hist_table)
-                elements.append(Spacer(1, 20))
-        
-        st.text('Building PDF...')
-        # Build PDF
-        doc.build(elements)
-        st.text('PDF generation completed!')
-        
-        # Clean up temporary directory
-        import shutil
-        shutil.rmtree(temp_dir)
-        
-        return pdf_path
-        
-    except Exception as e:
-        st.error(f"Error in create_pdf_report: {str(e)}")
-        raise e
-
-# Function to get file path using tkinter
-def get_file_path():
-    root = Tk()
-    root.withdraw()  # Hide the root window
-    file_path = askopenfilename(filetypes=[("Excel files", "*.xlsx *.xlsm")])
-    root.destroy()
-    return file_path
-
-# Add function to load and encode image
-def get_image_base64(image_path):
-    with Image.open(image_path) as img:
-        # Convert to RGB if image is in RGBA format
-        if img.mode == 'RGBA':
-            img = img.convert('RGB')
-        buffer = io.BytesIO()
-        img.save(buffer, format='PNG')
-        return base64.b64encode(buffer.getvalue()).decode()
+        # Add range slider without title and label
+        min_val, max_val = st.slider(
+            " ",  # Empty space as label to maintain layout
+            min_value=float(min_value),
+            max_value=float(max_value),
+            key=f'range_slider_{i}_{filter_header}',
+            on_change=update_inputs
+        )
+        return range_filter(filter_header, min_val, max_val,
+                            include_low=condition_min != 'Greater than',
+                            include_high=condition_max != 'Less than')
+    else:
+        unique_values = column_values(df, filter_header)
+        selected_values = st.multiselect(f'Select values for "{filter_header}"', unique_values, key=f'values_{i}_{filter_header}')
+        return values_filter(filter_header, selected_values)
+
+# Function to draw the statistics and the plot of a Monte Carlo run
+def render_monte_carlo_results(results):
+    mean_trajectory = results['mean']
+    min_trajectory = results['min']
+    max_trajectory = results['max']
+    
+    # Display statistics in a row above the plot
+    stats_col1, stats_col2, stats_col3 = st.columns(3)
+    
+    with stats_col1:
+        st.metric("Maximum Drawdown", f"{min_trajectory.min():.2f}")
+    with stats_col2:
+        st.metric("Median Value", f"{np.median(mean_trajectory):.2f}")
+    with stats_col3:
+        st.metric("Mean Value", f"{mean_trajectory.mean():.2f}")
+    
+    # Create the plot using plotly
+    fig = go.Figure()
+    
+    # Add individual trajectories
+    for trajectory in results['sample'][:100]:  # Show only 100 sampled trajectories
+        fig.add_trace(go.Scatter(
+            y=trajectory,
+            mode='lines',
+            line=dict(color='gray', width=0.5),
+            opacity=0.1,
+            showlegend=False
+        ))
+    
+    # Add mean trajectory
+    fig.add_trace(go.Scatter(
+        y=mean_trajectory,
+        mode='lines',
+        name='Most Likely Range',
+        line=dict(color='blue', width=2)
+    ))
+    
+    # Add percentile bands
+    for p, percentile_trajectory in sorted(results['percentiles'].items()):
+        fig.add_trace(go.Scatter(
+            y=percentile_trajectory,
+            mode='lines',
+            name=f'P{p}',
+            line=dict(color='purple', width=1, dash='dot')
+        ))
+    
+    # Add min and max trajectories
+    fig.add_trace(go.Scatter(
+        y=min_trajectory,
+        mode='lines',
+        name='Worst Case',
+        line=dict(color='red', width=1, dash='dash')
+    ))
+    
+    fig.add_trace(go.Scatter(
+        y=max_trajectory,
+        mode='lines',
+        name='Best Case',
+        line=dict(color='green', width=1, dash='dash')
+    ))
+    
+    # Add area between min and max
+    fig.add_trace(go.Scatter(
+        x=list(range(len(min_trajectory))),
+        y=min_trajectory,
+        fill=None,
+        mode='lines',
+        line_color='rgba(0,0,0,0)',
+        showlegend=False
+    ))
+    
+    fig.add_trace(go.Scatter(
+        x=list(range(len(max_trajectory))),
+        y=max_trajectory,
+        fill='tonexty',
+        mode='lines',
+        line_color='rgba(0,0,0,0)',
+        fillcolor='rgba(0,0,255,0.2)',
+        name='Range'
+    ))
+    
+    #Update layout
+    fig.update_layout(
+        xaxis_title="Trade #",
+        yaxis_title="Equity",
+        showlegend=True,
+        legend=dict(
+            yanchor="top",
+            y=0.99,
+            xanchor="left",
+            x=0.01
+        ),
+        height=600,
+        margin=dict(l=50, r=50, t=50, b=50)
+    )
+    
+    # Add grid
+    fig.update_xaxes(showgrid=True, gridwidth=1, gridcolor='LightGrey')
+    fig.update_yaxes(showgrid=True, gridwidth=1, gridcolor='LightGrey')
+    
+    # Display the plot
+    container = st.container()
+    with container:
+        st.markdown('<div style="width: 80%; margin: 0 auto;">', unsafe_allow_html=True)
+        st.plotly_chart(fig, use_container_width=True)
+        st.markdown('</div>', unsafe_allow_html=True)
 
-# Custom CSS to make the select boxes and container wider
-st.markdown(
+# Function to build the HTML of one metrics table pair
+def get_metrics_html(metrics):
+    return f"""
+    <div style="display: flex; justify-content: space-between; margin-top: 10px;">
+        <table class="custom-table" style="margin-right: 10px;">
+            <tr>
+                <td class="bold-text">Win Rate</td>
+                <td class="bold-text">{metrics['win_rate']:.2f}%</td>
+            </tr>
+            <tr>
+                <td class="bold-text">Net Win</td>
+                <td class="bold-text">{metrics['net_win']:.2f} R</td>
+            </tr>
+            <tr>
+                <td>Total Win</td>
+                <td>{metrics['total_win']:.2f} R</td>
+            </tr>
+            <tr>
+                <td>Total Loss</td>
+                <td>{metrics['total_loss']:.2f} R</td>
+            </tr>
+        </table>
+        <table class="custom-table">
+            <tr>
+                <td class="bold-text">SQN</td>
+                <td class="bold-text">{metrics['sqn']:.2f}</td>
+            </tr>
+            <tr>
+                <td>StdDev</td>
+                <td>{metrics['std_dev']:.2f}</td>
+            </tr>
+            <tr>
+                <td>Median R</td>
+                <td>{metrics['median_r']:.2f}</td>
+            </tr>
+            <tr>
+                <td>Mode</td>
+                <td>{metrics['mode_r']:.2f}</td>
+            </tr>
+            <tr>
+                <td>Avrg R</td>
+                <td>{metrics['avg_r']:.2f}</td>
+            </tr>
+        </table>
+    </div>
     """
+
+# The page only runs as the Streamlit script. The Monte Carlo and chart worker processes are started
+# with spawn and import this file as __mp_main__, which must only define the functions above.
+if __name__ == '__main__':
+    # Check if an uploaded file is already in session state
+    if 'file_name' not in st.session_state:
+        st.session_state.file_name = None
+        st.session_state.file_data = None
+        st.session_state.file_digest = None
+        st.session_state.file_id = None
+
+    # Initialize show_table in session state
+    if 'show_table' not in st.session_state:
+        st.session_state.show_table = False
+
+    # Opt-in stage timings for this run: start the app with SAD_DEBUG=1 or open it with ?debug=1
+    debug_mode = os.environ.get('SAD_DEBUG') == '1' or st.query_params.get('debug') == '1'
+    run_profile = RunProfile(enabled=debug_mode, label=st.session_state.file_name)
+    if debug_mode and st.session_state.pop('profile_next_run', False):
+        run_profile.start_capture(os.environ.get('SAD_PROFILER', 'cprofile'))
+
+    # Set when a PDF report job is still running, so the end of the script schedules the next poll
+    poll_report_job = False
+    REPORT_POLL_SECONDS = 0.5
+    
+    # Custom CSS to make the select boxes and container wider
+    st.markdown(
+        """
     <style>
     /* Center content and set max width */
     .main .block-container {
@@ -354,657 +392,349 @@ st.markdown(
         margin-left: auto !important;
         margin-right: auto !important;
     }
+
+    /* Rounded corners for the logo served through st.image */
+    [data-testid="stImage"] img {
+        border-radius: 15px;
+    }
     </style>
     """,
-    unsafe_allow_html=True
-)
+        unsafe_allow_html=True
+    )
 
-# Show tabs only if a file is selected
-if st.session_state.file_path:
-    tab1, tab2 = st.tabs(["Signal Analyzer", "Monte Carlo Analysis"])
-    
-    with tab1:
-        # Title and button in the same line
-        col1, col2 = st.columns([3, 1])
+    # Show tabs only if a file is selected
+    if st.session_state.file_name:
+        tab1, tab2 = st.tabs(["Signal Analyzer", "Monte Carlo Analysis"])
+        
+        with tab1:
+            # Title and button in the same line
+            col1, col2 = st.columns([3, 1])
 
-        with col1:
-            st.markdown("# **Signal Analyzer Dashboard**")
+            with col1:
+                st.markdown("# **Signal Analyzer Dashboard**")
 
-        with col2:
-            st.markdown('<div class="file-section">', unsafe_allow_html=True)
-            container = st.container()
-            with container:
-                if st.button('Select Excel file', key='select_file'):
-                    file_path = get_file_path()
-                    if file_path:
-                        st.session_state.file_path = file_path
-                        file_name = os.path.basename(file_path)
-                        st.markdown(f'<div class="file-text">Selected file: {file_name}</div>', unsafe_allow_html=True)
-                elif st.session_state.file_path:
-                    file_name = os.path.basename(st.session_state.file_path)
-                    st.markdown(f'<div class="file-text">Selected file: {file_name}</div>', unsafe_allow_html=True)
-            st.markdown('</div>', unsafe_allow_html=True)
-        
-        # Horizontal line with shadow
-        st.markdown("<hr>", unsafe_allow_html=True)
-        
-        # Load the Excel file
-        df = pd.read_excel(st.session_state.file_path, engine='openpyxl')
-        
-        # Display logo2 after loading Excel
-        try:
-            logo2_base64 = get_image_base64(r"C:\Users\monau\Downloads\logo2.png")
-            st.markdown(f"""
+            with col2:
+                st.markdown('<div class="file-section">', unsafe_allow_html=True)
+                container = st.container()
+                with container:
+                    store_uploaded_file(upload_data_file('change_file'))
+                    st.markdown(f'<div class="file-text">Selected file: {st.session_state.file_name}</div>', unsafe_allow_html=True)
+                    
+                    # Sheet selector for workbooks with more than one sheet
+                    sheets = list_sheets(st.session_state.file_name, st.session_state.file_data, st.session_state.file_digest)
+                    if len(sheets) > 1:
+                        sheet_name = st.selectbox('Sheet', sheets, key=f'sheet_{st.session_state.file_digest}')
+                    else:
+                        sheet_name = sheets[0]
+                    
+                    # Compact mode downcasts numeric columns to save server memory
+                    compact_mode = st.checkbox('Compact memory mode', key='compact_mode',
+                                               help='Downcast numeric columns to smaller types where no value changes '
+                                                    '(filters and metrics are unchanged)')
+                st.markdown('</div>', unsafe_allow_html=True)
+            
+            # Horizontal line with shadow
+            st.markdown("<hr>", unsafe_allow_html=True)
+            
+            # Load the data file (parsed once and shared across reruns and tabs)
+            with run_profile.span('load') as load_span:
+                df = load_dataframe(st.session_state.file_name, sheet_name,
+                                    data=st.session_state.file_data, digest=st.session_state.file_digest, compact=compact_mode)
+            
+            # Report the memory footprint of the loaded frame, before and after encoding/compaction
+            parsed_bytes, loaded_bytes = get_footprint(st.session_state.file_name, sheet_name,
+                                                       data=st.session_state.file_data, digest=st.session_state.file_digest,
+                                                       compact=compact_mode)
+            load_span['rows'], load_span['bytes'] = len(df), loaded_bytes
+            if loaded_bytes is not None:
+                with container:
+                    if parsed_bytes:
+                        st.caption(f'Memory: {parsed_bytes / 1024**2:.1f} MB as parsed, {loaded_bytes / 1024**2:.1f} MB loaded')
+                    else:
+                        st.caption(f'Memory: {loaded_bytes / 1024**2:.1f} MB loaded')
+            
+            # Display logo2 after loading the data (an 80px badge, so a downscaled copy is inlined)
+            logo2_path = resolve_asset('logo2.png')
+            if logo2_path:
+                with run_profile.span('logo'):
+                    logo2_base64 = asset_base64(logo2_path, max_size=160)
+                st.markdown(f"""
                 <div style='text-align: center; margin-top: -60px; margin-bottom: -40px; position: relative; z-index: 1;'>
                     <img src='data:image/png;base64,{logo2_base64}' alt='Logo2' style='width: 80px; height: 80px; object-fit: contain; border-radius: 50%; position: relative; z-index: 2;'>
                 </div>
             """, unsafe_allow_html=True)
-        except Exception as e:
-            st.error(f"Error loading logo2: {str(e)}")
-        
-        # Calculate total rows
-        total_rows = len(df)
-        
-        # Initialize filtered dataframes
-        df_filtered1 = df.copy()
-        df_filtered2 = df.copy()
+            
+            # Calculate total rows
+            total_rows = len(df)
+            
+            # Create a row for section titles
+            title_col1, title_col2, title_col3 = st.columns([0.9, 0.9, 1.2])
+            
+            with title_col1:
+                st.markdown("### Filters")
+            
+            with title_col2:
+                num_filters = st.selectbox(
+                    "Num of Filters",
+                    options=[2, 3, 4, 5, 6],
+                    index=0,
+                    key="num_filters"
+                )
+            
+            with title_col3:
+                st.markdown("### Metrics")
+
+            # Create columns for Filter 1 and Filter 2, further filters go in the rows below
+            col1, col2, col3 = st.columns([0.9, 0.9, 1.2])
+            filter_cols = [col1, col2]
+            for row_start in range(2, num_filters, 3):
+                filter_cols.extend(st.columns(3)[:min(3, num_filters - row_start)])
+
+            # Render every filter, then evaluate them together against one row mask
+            filter_specs = []
+            for i, filter_col in enumerate(filter_cols):
+                with filter_col:
+                    filter_specs.append(render_filter(df, i + 1))
+
+            with run_profile.span('filters', rows=len(df)):
+                filter_rows, filter_counts = evaluate_filters(df, filter_specs)
+            count_2 = filter_counts[-1]
+            # Nothing is copied here: consumers slice the columns they need from the view
+            df_filtered2 = FilteredView(df, filter_rows)
+
+            # Display the probability chain P(A), P(B|A), P(C|A,B)... under each filter
+            for i, (filter_col, (joint, conditional)) in enumerate(zip(filter_cols, probability_chain(filter_counts, total_rows))):
+                with filter_col:
+                    if i == 0:
+                        st.markdown(f"**P({FILTER_LETTERS[0]}): {joint:.2f}%**")
+                    else:
+                        given = ','.join(FILTER_LETTERS[:i])
+                        st.markdown(f"""
+                        <div style='display: flex; align-items: center; gap: 10px;'>
+                            <span><strong>P({FILTER_LETTERS[i]}): {joint:.2f}%</strong></span>
+                            <span style='color: #888; font-size: 18px;'>⚡</span>
+                            <span><strong>P({FILTER_LETTERS[i]}|{given}): {conditional:.2f}%</strong></span>
+                        </div>
+                    """, unsafe_allow_html=True)
 
-        # Create a row for section titles
-        title_col1, title_col2, title_col3 = st.columns([0.9, 0.9, 1.2])
-        
-        with title_col1:
-            st.markdown("### Filters")
-        
-        with title_col2:
-            st.markdown("")  # Empty space to maintain alignment
-        
-        with title_col3:
-            st.markdown("### Metrics")
+            # Metrics are cached on the dataset and the filter settings, so unrelated widgets do not recompute them
+            metrics_key = ((st.session_state.file_digest, sheet_name, compact_mode), tuple(filter_specs))
 
-        # Create columns for Filter 1 and Filter 2
-        col1, col2, col3 = st.columns([0.9, 0.9, 1.2])
+            with col3:
+                # Create two metrics controls side by side
+                metrics_col1, metrics_col2 = st.columns(2)
+                
+                with metrics_col1:
+                    metrics_column1 = st.selectbox('Select column for metrics (No SC-In)', df.columns, key='metrics1')
+                    
+                    if pd.api.types.is_numeric_dtype(df[metrics_column1]):
+                        # Calculate metrics for first column
+                        if count_2 > 0:
+                            with run_profile.span(f'metrics: {metrics_column1}', rows=count_2):
+                                metrics_data = cached_metrics(metrics_key + (metrics_column1,), lambda: df_filtered2[metrics_column1])
+                            st.markdown(get_metrics_html(metrics_data), unsafe_allow_html=True)
+                        else:
+                            st.write("No data available")
+                    else:
+                        st.write("Select numeric column")
 
-        with col1:
-            # Dropdown to select the filter header for Filter 1
-            filter_header_1 = st.selectbox('Select the header to filter 1', df.columns)
+                with metrics_col2:
+                    metrics_column2 = st.selectbox('Select column for metrics (SC-In)', df.columns, key='metrics2')
+                    
+                    if pd.api.types.is_numeric_dtype(df[metrics_column2]):
+                        # Calculate metrics for second column
+                        if count_2 > 0:
+                            with run_profile.span(f'metrics: {metrics_column2}', rows=count_2):
+                                metrics_data = cached_metrics(metrics_key + (metrics_column2,), lambda: df_filtered2[metrics_column2])
+                            st.markdown(get_metrics_html(metrics_data), unsafe_allow_html=True)
+                        else:
+                            st.write("No data available")
+                    else:
+                        st.write("Select numeric column")
 
-            if pd.api.types.is_datetime64_any_dtype(df[filter_header_1]):
-                min_date = df[filter_header_1].min()
-                max_date = df[filter_header_1].max()
-                date_range = st.date_input(f'Select the date range for "{filter_header_1}"', [min_date, max_date])
-                if len(date_range) == 2:
-                    start_date = datetime.combine(date_range[0], datetime.min.time())
-                    end_date = datetime.combine(date_range[1], datetime.min.time())
-                    df_filtered1 = df[(df[filter_header_1] >= start_date) & (df[filter_header_1] <= end_date)]
-                else:
-                    df_filtered1 = df.copy()
-            elif pd.api.types.is_numeric_dtype(df[filter_header_1]):
-                min_value = float(round(df[filter_header_1].min(), 2))
-                max_value = float(round(df[filter_header_1].max(), 2))
-                
-                # Initialize session state if not exists
-                if f'number_min_1_{filter_header_1}' not in st.session_state:
-                    st.session_state[f'number_min_1_{filter_header_1}'] = min_value
-                if f'number_max_1_{filter_header_1}' not in st.session_state:
-                    st.session_state[f'number_max_1_{filter_header_1}'] = max_value
-                if f'range_slider_1_{filter_header_1}' not in st.session_state:
-                    st.session_state[f'range_slider_1_{filter_header_1}'] = (min_value, max_value)
+            # Create columns for the table and charts
+            if count_2 > 0:
+                # Add button to show/hide DataFrame
+                if st.button('Show/Hide Data Table'):
+                    st.session_state.show_table = not st.session_state.show_table
                 
-                # Callback functions for Filter 1
-                def update_slider_1():
-                    st.session_state[f'range_slider_1_{filter_header_1}'] = (
-                        st.session_state[f'number_min_1_{filter_header_1}'],
-                        st.session_state[f'number_max_1_{filter_header_1}']
-                    )
+                # Show DataFrame if button was clicked
+                if st.session_state.show_table:
+                    st.dataframe(df_filtered2.frame())
 
-                def update_inputs_1():
-                    st.session_state[f'number_min_1_{filter_header_1}'] = st.session_state[f'range_slider_1_{filter_header_1}'][0]
-                    st.session_state[f'number_max_1_{filter_header_1}'] = st.session_state[f'range_slider_1_{filter_header_1}'][1]
-                
-                col1_1, col1_2 = st.columns(2)
+                # Add horizontal line before Histograms title
+                st.markdown("<hr>", unsafe_allow_html=True)
+
+                # Create a row for the title and histogram count selector
+                title_col, selector_col = st.columns([14, 1])
                 
-                with col1_1:
-                    condition_min = st.selectbox('Condition (Min)', ['Greater than or equal to', 'Greater than'])
-                    min_input = st.number_input(
-                        f'Value ({min_value:.2f} : {max_value:.2f})', 
-                        min_value=float(min_value),
-                        max_value=float(max_value),
-                        key=f'number_min_1_{filter_header_1}',
-                        on_change=update_slider_1
-                    )
+                with title_col:
+                    st.markdown("### Histograms")
                 
-                with col1_2:
-                    condition_max = st.selectbox('Condition (Max)', ['Less than or equal to', 'Less than'])
-                    max_input = st.number_input(
-                        f'Value ({min_value:.2f} : {max_value:.2f})', 
-                        min_value=float(min_value),
-                        max_value=float(max_value),
-                        key=f'number_max_1_{filter_header_1}',
-                        on_change=update_slider_1
+                with selector_col:
+                    st.markdown('<div class="histogram-count-selector">', unsafe_allow_html=True)
+                    num_histograms = st.selectbox(
+                        "Num of Charts",
+                        options=[2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12],
+                        index=4,
+                        key="num_histograms"
                     )
-                
-                # Add range slider without title and label
-                min_val, max_val = st.slider(
-                    " ",  # Empty space as label to maintain layout
-                    min_value=float(min_value),
-                    max_value=float(max_value),
-                    key=f'range_slider_1_{filter_header_1}',
-                    on_change=update_inputs_1
-                )
-
-                if condition_min == 'Greater than':
-                    df_filtered1 = df[df[filter_header_1] > min_val]
-                else:
-                    df_filtered1 = df[df[filter_header_1] >= min_val]
-                
-                if condition_max == 'Less than':
-                    df_filtered1 = df_filtered1[df_filtered1[filter_header_1] < max_val]
-                else:
-                    df_filtered1 = df_filtered1[df_filtered1[filter_header_1] <= max_val]
-            else:
-                unique_values = df[filter_header_1].unique()
-                selected_values = st.multiselect(f'Select values for "{filter_header_1}"', unique_values)
-                if selected_values:
-                    df_filtered1 = df[df[filter_header_1].isin(selected_values)]
-                else:
-                    df_filtered1 = df.copy()
+                    st.markdown('</div>', unsafe_allow_html=True)
 
-            # After filter 1 settings, display P(A)
-            if not df_filtered1.empty:
-                p_a = (len(df_filtered1)/total_rows)*100
-                st.markdown(f"**P(A): {p_a:.2f}%**")
-            else:
-                st.markdown("**P(A): 0.00%**")
-
-        st.markdown('<div class="vl"></div>', unsafe_allow_html=True)
-
-        with col2:
-            filter_header_2 = st.selectbox('Select the header to filter 2', df.columns)
+                # Get numeric columns for charts
+                chart_columns = [col for col in df.columns if pd.api.types.is_numeric_dtype(df[col])]
 
-            if pd.api.types.is_datetime64_any_dtype(df[filter_header_2]):
-                min_date = df[filter_header_2].min()
-                max_date = df[filter_header_2].max()
-                date_range = st.date_input(f'Select the date range for "{filter_header_2}"', [min_date, max_date])
-                if len(date_range) == 2:
-                    start_date = datetime.combine(date_range[0], datetime.min.time())
-                    end_date = datetime.combine(date_range[1], datetime.min.time())
-                    df_filtered2 = df_filtered1[(df_filtered1[filter_header_2] >= start_date) & (df_filtered1[filter_header_2] <= end_date)]
-                else:
-                    df_filtered2 = df_filtered1.copy()
-            elif pd.api.types.is_numeric_dtype(df[filter_header_2]):
-                min_value = float(round(df[filter_header_2].min(), 2))
-                max_value = float(round(df[filter_header_2].max(), 2))
+                # Calculate number of rows needed
+                num_rows = (num_histograms + 5) // 6  # Round up division
                 
-                # Initialize session state if not exists
-                if f'number_min_2_{filter_header_2}' not in st.session_state:
-                    st.session_state[f'number_min_2_{filter_header_2}'] = min_value
-                if f'number_max_2_{filter_header_2}' not in st.session_state:
-                    st.session_state[f'number_max_2_{filter_header_2}'] = max_value
-                if f'range_slider_2_{filter_header_2}' not in st.session_state:
-                    st.session_state[f'range_slider_2_{filter_header_2}'] = (min_value, max_value)
+                # Create rows of charts
+                histograms_span = run_profile.begin('histograms', rows=count_2)
+                for row in range(num_rows):
+                    # Calculate how many charts in this row
+                    charts_in_row = min(6, num_histograms - (row * 6))
+                    
+                    # Create columns for this row
+                    cols = st.columns(6)  # Always create 6 columns
+                    
+                    # Process each column in this row
+                    for i in range(charts_in_row):
+                        with cols[i]:
+                            selected_column = st.selectbox(f'Chart {row*6 + i + 1}', chart_columns, key=f'chart_{row*6 + i}')
+                            chart_span = run_profile.begin(f'chart: {selected_column}')
+                            
+                            if pd.api.types.is_numeric_dtype(df[selected_column]):
+                                # Freedman-Diaconis bins from the cached column summary
+                                summary = cached_summary(metrics_key + (selected_column,), lambda: df_filtered2[selected_column])
+                                
+                                if summary['edges'] is None:
+                                    st.write("Data is constant")
+                                else:
+                                    bins, counts = summary['edges'], summary['counts']
+                                    bin_labels = [f"[{bins[i]:.1f}, {bins[i+1]:.1f})" for i in range(len(bins) - 1)]
+                                    
+                                    fig = px.bar(x=bin_labels, y=counts,
+                                               labels={'x': '', 'y': 'Frequency'})
+                                    
+                                    # Color bars based on the numeric bin edges
+                                    fig.update_traces(
+                                        marker_color=np.where(bins[:-1] < 0, '#FF8989', '#1f77b4'),
+                                        width=0.5
+                                    )
+                                    
+                                    fig.update_layout(
+                                        title={
+                                            'text': f'Distribution of "{selected_column}"',
+                                            'y': 0.95,
+                                            'x': 0.5,
+                                            'xanchor': 'center',
+                                            'yanchor': 'top',
+                                            'font': {'size': 14}
+                                        },
+                                        xaxis_tickangle=-45,
+                                        height=400,
+                                        margin=dict(l=20, r=20, t=60, b=80),
+                                        showlegend=False,
+                                        bargap=0.1
+                                    )
+                                    
+                                    # Display the plot
+                                    container = st.container()
+                                    with container:
+                                        st.markdown('<div style="width: 80%; margin: 0 auto;">', unsafe_allow_html=True)
+                                        st.plotly_chart(fig, use_container_width=True)
+                                        st.markdown('</div>', unsafe_allow_html=True)
+                            run_profile.end(chart_span)
+                run_profile.end(histograms_span)
                 
-                # Callback functions for Filter 2
-                def update_slider_2():
-                    st.session_state[f'range_slider_2_{filter_header_2}'] = (
-                        st.session_state[f'number_min_2_{filter_header_2}'],
-                        st.session_state[f'number_max_2_{filter_header_2}']
-                    )
-
-                def update_inputs_2():
-                    st.session_state[f'number_min_2_{filter_header_2}'] = st.session_state[f'range_slider_2_{filter_header_2}'][0]
-                    st.session_state[f'number_max_2_{filter_header_2}'] = st.session_state[f'range_slider_2_{filter_header_2}'][1]
+                # Add horizontal line before report buttons
+                st.markdown("<hr>", unsafe_allow_html=True)
                 
-                col2_1, col2_2 = st.columns(2)
+                # Add report type selector and buttons
+                report_col1, report_col2, report_col3 = st.columns([1, 1, 1])
                 
-                with col2_1:
-                    condition_min = st.selectbox('Condition (Min)', ['Greater than or equal to', 'Greater than'], key='condition_min_2')
-                    min_input = st.number_input(
-                        f'Value ({min_value:.2f} : {max_value:.2f})', 
-                        min_value=float(min_value),
-                        max_value=float(max_value),
-                        key=f'number_min_2_{filter_header_2}',
-                        on_change=update_slider_2
+                with report_col1:
+                    # Add report type selector
+                    report_type = st.selectbox(
+                        "Report Type",
+                        ["Visible Histograms Only", "All Numeric Columns"],
+                        help="Choose whether to include only the visible histograms or all numeric columns in the report"
                     )
-                
-                with col2_2:
-                    condition_max = st.selectbox('Condition (Max)', ['Less than or equal to', 'Less than'], key='condition_max_2')
-                    max_input = st.number_input(
-                        f'Value ({min_value:.2f} : {max_value:.2f})', 
-                        min_value=float(min_value),
-                        max_value=float(max_value),
-                        key=f'number_max_2_{filter_header_2}',
-                        on_change=update_slider_2
+                    chart_format_label = st.selectbox(
+                        "Chart Format",
+                        ["Raster (PNG)", "Vector"],
+                        key='chart_format',
+                        help="Vector charts are drawn natively in the PDF: much smaller files that stay sharp at any zoom"
+                    )
+                    # Histograms are printed at 250x150 pt, higher resolutions mostly add file size
+                    chart_dpi = st.selectbox(
+                        "Chart Resolution (DPI)",
+                        [100, 150, 200, 300],
+                        index=[100, 150, 200, 300].index(DEFAULT_CHART_DPI),
+                        key='chart_dpi',
+                        disabled=chart_format_label == "Vector"
                     )
                 
-                # Add range slider without title and label
-                min_val, max_val = st.slider(
-                    " ",  # Empty space as label to maintain layout
-                    min_value=float(min_value),
-                    max_value=float(max_value),
-                    key=f'range_slider_2_{filter_header_2}',
-                    on_change=update_inputs_2
-                )
-
-                if condition_min == 'Greater than':
-                    df_filtered2 = df_filtered1[df_filtered1[filter_header_2] > min_val]
-                else:
-                    df_filtered2 = df_filtered1[df_filtered1[filter_header_2] >= min_val]
-                
-                if condition_max == 'Less than':
-                    df_filtered2 = df_filtered2[df_filtered2[filter_header_2] < max_val]
-                else:
-                    df_filtered2 = df_filtered2[df_filtered2[filter_header_2] <= max_val]
-            else:
-                unique_values = df[filter_header_2].unique()
-                selected_values = st.multiselect(f'Select values for "{filter_header_2}"', unique_values)
-                if selected_values:
-                    df_filtered2 = df_filtered1[df_filtered1[filter_header_2].isin(selected_values)]
-                else:
-                    df_filtered2 = df_filtered1.copy()
-
-            # After filter 2 settings, display P(B) and P(B|A)
-            if not df_filtered2.empty:
-                p_b = (len(df_filtered2)/total_rows)*100
-                if not df_filtered1.empty:
-                    p_b_given_a = (len(df_filtered2) / len(df_filtered1)) * 100
-                    st.markdown(f"""
-                        <div style='display: flex; align-items: center; gap: 10px;'>
-                            <span><strong>P(B): {p_b:.2f}%</strong></span>
-                            <span style='color: #888; font-size: 18px;'>⚡</span>
-                            <span><strong>P(B|A): {p_b_given_a:.2f}%</strong></span>
-                        </div>
-                    """, unsafe_allow_html=True)
+                # Report columns and the key of the report: data, filters, metrics columns, chart columns and options
+                if report_type == "Visible Histograms Only":
+                    # Get the number of histograms from session state
+                    num_histograms = st.session_state.get("num_histograms", 6)
+                    # Get the selected columns for visible histograms
+                    report_columns = [st.session_state.get(f'chart_{i}') for i in range(num_histograms)]
+                    report_columns = [col for col in report_columns if col and pd.api.types.is_numeric_dtype(df[col])]
                 else:
-                    st.markdown(f"**P(B): {p_b:.2f}%**")
-            else:
-                st.markdown("""
-                    <div style='display: flex; align-items: center; gap: 10px;'>
-                        <span><strong>P(B): 0.00%</strong></span>
-                        <span style='color: #888; font-size: 18px;'>⚡</span>
-                        <span><strong>P(B|A): 0.00%</strong></span>
-                    </div>
-                """, unsafe_allow_html=True)
-
-        with col3:
-            # Create two metrics controls side by side
-            metrics_col1, metrics_col2 = st.columns(2)
-            
-            with metrics_col1:
-                metrics_column1 = st.selectbox('Select column for metrics (No SC-In)', df.columns, key='metrics1')
+                    # Get all numeric columns
+                    report_columns = [col for col in df.columns if pd.api.types.is_numeric_dtype(df[col])]
+                chart_format = 'vector' if chart_format_label == "Vector" else 'png'
+                report_key = metrics_key + ((metrics_column1, metrics_column2), tuple(report_columns), report_type, chart_format,
+                                            chart_dpi if chart_format == 'png' else None)
                 
-                if pd.api.types.is_numeric_dtype(df[metrics_column1]):
-                    # Calculate metrics for first column
-                    total_elements = len(df_filtered2)
-                    if total_elements > 0:
-                        # Win Rate
-                        wins = len(df_filtered2[df_filtered2[metrics_column1] > 0])
-                        win_rate = (wins / total_elements) * 100
-                        
-                        # Total Win and Loss
-                        total_win = df_filtered2[df_filtered2[metrics_column1] > 0][metrics_column1].sum()
-                        total_loss = df_filtered2[df_filtered2[metrics_column1] < 0][metrics_column1].sum()
-                        net_win = total_win + total_loss
-                        
-                        # Statistical metrics
-                        std_dev = df_filtered2[metrics_column1].std()
-                        median_r = df_filtered2[metrics_column1].median()
-                        mode_r = df_filtered2[metrics_column1].mode().iloc[0] if not df_filtered2[metrics_column1].mode().empty else 0
-                        avg_r = df_filtered2[metrics_column1].mean()
-                        
-                        # SQN calculation
-                        sqn = (avg_r / std_dev) * np.sqrt(total_elements) if std_dev != 0 else 0
-                        
-                        # Create HTML for first metrics table
-                        html1 = f"""
-                        <div style="display: flex; justify-content: space-between; margin-top: 10px;">
-                            <table class="custom-table" style="margin-right: 10px;">
-                                <tr>
-                                    <td class="bold-text">Win Rate</td>
-                                    <td class="bold-text">{win_rate:.2f}%</td>
-                                </tr>
-                                 <tr>
-                                    <td class="bold-text">Net Win</td>
-                                    <td class="bold-text">{net_win:.2f} R</td>
-                                </tr>
-                                <tr>
-                                    <td>Total Win</td>
-                                    <td>{total_win:.2f} R</td>
-                                </tr>
-                                <tr>
-                                    <td>Total Loss</td>
-                                    <td>{total_loss:.2f} R</td>
-                                </tr>                           
-                            </table>
-                            <table class="custom-table">
-                              <tr>
-                                    <td class="bold-text">SQN</td>
-                                    <td class="bold-text">{sqn:.2f}</td>
-                                </tr>
-                                <tr>
-                                    <td>StdDev</td>
-                                    <td>{std_dev:.2f}</td>
-                                </tr>
-                                <tr>
-                                    <td>Median R</td>
-                                    <td>{median_r:.2f}</td>
-                                </tr>
-                                <tr>
-                                    <td>Mode</td>
-                                    <td>{mode_r:.2f}</td>
-                                </tr>
-                                <tr>
-                                    <td>Avrg R</td>
-                                    <td>{avg_r:.2f}</td>
-                                </tr>                          
-                            </table>
-                        </div>
-                        """
-                        st.markdown(html1, unsafe_allow_html=True)
-                    else:
-                        st.write("No data available")
-                else:
-                    st.write("Select numeric column")
-
-            with metrics_col2:
-                metrics_column2 = st.selectbox('Select column for metrics (SC-In)', df.columns, key='metrics2')
+                # Function to build the report on the job thread (no Streamlit calls in there)
+                def build_report(progress, report_columns=report_columns, metrics_column1=metrics_column1,
+                                 metrics_column2=metrics_column2, chart_format=chart_format, chart_dpi=chart_dpi):
+                    progress(0.0, 'Preparing metrics data...')
+                    metrics_columns = [col for col in (metrics_column1, metrics_column2) if pd.api.types.is_numeric_dtype(df[col])]
+                    column_summaries = cached_summaries(metrics_key, df, list(dict.fromkeys(report_columns + metrics_columns)), filter_rows)
+                    metrics_data1 = column_summaries[metrics_column1]['metrics'] if metrics_column1 in metrics_columns else None
+                    metrics_data2 = column_summaries[metrics_column2]['metrics'] if metrics_column2 in metrics_columns else None
+                    return build_pdf_report(len(df), count_2, metrics_data1, metrics_data2, metrics_column1, metrics_column2,
+                                            report_columns, column_summaries, filter_specs, filter_counts,
+                                            chart_dpi=chart_dpi, chart_format=chart_format,
+                                            progress=progress)
                 
-                if pd.api.types.is_numeric_dtype(df[metrics_column2]):
-                    # Calculate metrics for second column
-                    total_elements = len(df_filtered2)
-                    if total_elements > 0:
-                        # Win Rate
-                        wins = len(df_filtered2[df_filtered2[metrics_column2] > 0])
-                        win_rate = (wins / total_elements) * 100
-                        
-                        # Total Win and Loss
-                        total_win = df_filtered2[df_filtered2[metrics_column2] > 0][metrics_column2].sum()
-                        total_loss = df_filtered2[df_filtered2[metrics_column2] < 0][metrics_column2].sum()
-                        net_win = total_win + total_loss
-                        
-                        # Statistical metrics
-                        std_dev = df_filtered2[metrics_column2].std()
-                        median_r = df_filtered2[metrics_column2].median()
-                        mode_r = df_filtered2[metrics_column2].mode().iloc[0] if not df_filtered2[metrics_column2].mode().empty else 0
-                        avg_r = df_filtered2[metrics_column2].mean()
-                        
-                        # SQN calculation
-                        sqn = (avg_r / std_dev) * np.sqrt(total_elements) if std_dev != 0 else 0
-                        
-                        # Create HTML for second metrics table
-                        html2 = f"""
-                        <div style="display: flex; justify-content: space-between; margin-top: 10px;">
-                            <table class="custom-table" style="margin-right: 10px;">
-                                <tr>
-                                    <td class="bold-text">Win Rate</td>
-                                    <td class="bold-text">{win_rate:.2f}%</td>
-                                </tr>
-                                <tr>
-                                    <td class="bold-text">Net Win</td>
-                                    <td class="bold-text">{net_win:.2f} R</td>
-                                </tr>
-                                <tr>
-                                    <td>Total Win</td>
-                                    <td>{total_win:.2f} R</td>
-                                </tr>
-                                <tr>
-                                    <td>Total Loss</td>
-                                    <td>{total_loss:.2f} R</td>
-                                </tr>                            
-                            </table>
-                            <table class="custom-table">
-                            <tr>
-                                    <td class="bold-text">SQN</td>
-                                    <td class="bold-text">{sqn:.2f}</td>
-                                </tr>
-                                <tr>
-                                    <td>StdDev</td>
-                                    <td>{std_dev:.2f}</td>
-                                </tr>
-                                <tr>
-                                    <td>Median R</td>
-                                    <td>{median_r:.2f}</td>
-                                </tr>
-                                <tr>
-                                    <td>Mode</td>
-                                    <td>{mode_r:.2f}</td>
-                                </tr>
-                                <tr>
-                                    <td>Avrg R</td>
-                                    <td>{avg_r:.2f}</td>
-                                </tr>                            
-                            </table>
-                        </div>
-                        """
-                        st.markdown(html2, unsafe_allow_html=True)
-                    else:
-                        st.write("No data available")
-                else:
-                    st.write("Select numeric column")
-
-        # Create columns for the table and charts
-        if not df_filtered2.empty:
-            # Add button to show/hide DataFrame
-            if st.button('Show/Hide Data Table'):
-                st.session_state.show_table = not st.session_state.show_table
-            
-            # Show DataFrame if button was clicked
-            if st.session_state.show_table:
-                st.dataframe(df_filtered2)
-
-            # Add horizontal line before Histograms title
-            st.markdown("<hr>", unsafe_allow_html=True)
-
-            # Create a row for the title and histogram count selector
-            title_col, selector_col = st.columns([14, 1])
-            
-            with title_col:
-                st.markdown("### Histograms")
-            
-            with selector_col:
-                st.markdown('<div class="histogram-count-selector">', unsafe_allow_html=True)
-                num_histograms = st.selectbox(
-                    "Num of Charts",
-                    options=[2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12],
-                    index=4,
-                    key="num_histograms"
-                )
-                st.markdown('</div>', unsafe_allow_html=True)
-
-            # Get numeric columns for charts
-            chart_columns = [col for col in df_filtered2.columns if pd.api.types.is_numeric_dtype(df_filtered2[col])]
-
-            # Calculate number of rows needed
-            num_rows = (num_histograms + 5) // 6  # Round up division
-            
-            # Create rows of charts
-            for row in range(num_rows):
-                # Calculate how many charts in this row
-                charts_in_row = min(6, num_histograms - (row * 6))
-                
-                # Create columns for this row
-                cols = st.columns(6)  # Always create 6 columns
-                
-                # Process each column in this row
-                for i in range(charts_in_row):
-                    with cols[i]:
-                        selected_column = st.selectbox(f'Chart {row*6 + i + 1}', chart_columns, key=f'chart_{row*6 + i}')
-                        
-                        if pd.api.types.is_numeric_dtype(df_filtered2[selected_column]):
-                            # Freedman-Diaconis rule to determine bin width
-                            n = len(df_filtered2[selected_column])
-                            iqr = df_filtered2[selected_column].quantile(0.75) - df_filtered2[selected_column].quantile(0.25)
-                            bin_width = 2 * iqr * (n ** (-1/3))
-                            
-                            if bin_width == 0:
-                                data_range = df_filtered2[selected_column].max() - df_filtered2[selected_column].min()
-                                bin_width = data_range / 10 if data_range > 0 else 1
-                            
-                            if bin_width == 0:
-                                st.write("Data is constant")
-                            else:
-                                data_range = df_filtered2[selected_column].max() - df_filtered2[selected_column].min()
-                                num_bins = max(1, int(np.ceil(data_range / bin_width)))
-                                bins = np.linspace(df_filtered2[selected_column].min(), df_filtered2[selected_column].max(), num_bins + 1)
-                                bin_labels = [f"[{bins[i]:.1f}, {bins[i+1]:.1f})" for i in range(len(bins) - 1)]
-                                df_filtered2['bin'] = pd.cut(df_filtered2[selected_column], bins=bins, labels=bin_labels, right=False)
-                                bin_counts = df_filtered2['bin'].value_counts().sort_index().reset_index()
-                                bin_counts.columns = ['bin', 'count']
-
-                                # Extract numeric values from bin labels for coloring
-                                bin_counts['bin_start'] = bin_counts['bin'].str.extract(r'\[([-\d.]+),').astype(float)
-                                
-                                fig = px.bar(bin_counts, x='bin', y='count',
-                                           labels={'bin': '', 'count': 'Frequency'})
-                                
-                                # Color bars based on bin values
-                                fig.update_traces(
-                                    marker_color=['#FF8989' if val < 0 else '#1f77b4' for val in bin_counts['bin_start']],
-                                    width=0.5
-                                )
-                                
-                                fig.update_layout(
-                                    title={
-                                        'text': f'Distribution of "{selected_column}"',
-                                        'y': 0.95,
-                                        'x': 0.5,
-                                        'xanchor': 'center',
-                                        'yanchor': 'top',
-                                        'font': {'size': 14}
-                                    },
-                                    xaxis_tickangle=-45,
-                                    height=400,
-                                    margin=dict(l=20, r=20, t=60, b=80),
-                                    showlegend=False,
-                                    bargap=0.1
-                                )
-                                
-                                # Display the plot
-                                container = st.container()
-                                with container:
-                                    st.markdown('<div style="width: 80%; margin: 0 auto;">', unsafe_allow_html=True)
-                                    st.plotly_chart(fig, use_container_width=True)
-                                    st.markdown('</div>', unsafe_allow_html=True)
-            
-            # Add horizontal line before report buttons
-            st.markdown("<hr>", unsafe_allow_html=True)
-            
-            # Add report type selector and buttons
-            report_col1, report_col2, report_col3 = st.columns([1, 1, 1])
-            
-            with report_col1:
-                # Add report type selector
-                report_type = st.selectbox(
-                    "Report Type",
-                    ["Visible Histograms Only", "All Numeric Columns"],
-                    help="Choose whether to include only the visible histograms or all numeric columns in the report"
-                )
-            
-            with report_col2:
-                if st.button('Generate PDF Report'):
-                    try:
-                        with st.spinner('Generating PDF report...'):
-                            # Prepare metrics data
-                            st.text('Preparing metrics data...')
-                            metrics_data1 = None
-                            metrics_data2 = None
-                            
-                            if pd.api.types.is_numeric_dtype(df[metrics_column1]):
-                                total_elements = len(df_filtered2)
-                                if total_elements > 0:
-                                    wins = len(df_filtered2[df_filtered2[metrics_column1] > 0])
-                                    win_rate = (wins / total_elements) * 100
-                                    total_win = df_filtered2[df_filtered2[metrics_column1] > 0][metrics_column1].sum()
-                                    total_loss = df_filtered2[df_filtered2[metrics_column1] < 0][metrics_column1].sum()
-                                    net_win = total_win + total_loss
-                                    std_dev = df_filtered2[metrics_column1].std()
-                                    median_r = df_filtered2[metrics_column1].median()
-                                    mode_r = df_filtered2[metrics_column1].mode().iloc[0] if not df_filtered2[metrics_column1].mode().empty else 0
-                                    avg_r = df_filtered2[metrics_column1].mean()
-                                    sqn = (avg_r / std_dev) * np.sqrt(total_elements) if std_dev != 0 else 0
-                                    
-                                    metrics_data1 = {
-                                        'win_rate': win_rate,
-                                        'net_win': net_win,
-                                        'total_win': total_win,
-                                        'total_loss': total_loss,
-                                        'sqn': sqn,
-                                        'std_dev': std_dev,
-                                        'median_r': median_r,
-                                        'mode_r': mode_r,
-                                        'avg_r': avg_r
-                                    }
-                            
-                            if pd.api.types.is_numeric_dtype(df[metrics_column2]):
-                                total_elements = len(df_filtered2)
-                                if total_elements > 0:
-                                    wins = len(df_filtered2[df_filtered2[metrics_column2] > 0])
-                                    win_rate = (wins / total_elements) * 100
-                                    total_win = df_filtered2[df_filtered2[metrics_column2] > 0][metrics_column2].sum()
-                                    total_loss = df_filtered2[df_filtered2[metrics_column2] < 0][metrics_column2].sum()
-                                    net_win = total_win + total_loss
-                                    std_dev = df_filtered2[metrics_column2].std()
-                                    median_r = df_filtered2[metrics_column2].median()
-                                    mode_r = df_filtered2[metrics_column2].mode().iloc[0] if not df_filtered2[metrics_column2].mode().empty else 0
-                                    avg_r = df_filtered2[metrics_column2].mean()
-                                    sqn = (avg_r / std_dev) * np.sqrt(total_elements) if std_dev != 0 else 0
-                                    
-                                    metrics_data2 = {
-                                        'win_rate': win_rate,
-                                        'net_win': net_win,
-                                        'total_win': total_win,
-                                        'total_loss': total_loss,
-                                        'sqn': sqn,
-                                        'std_dev': std_dev,
-                                        'median_r': median_r,
-                                        'mode_r': mode_r,
-                                        'avg_r': avg_r
-                                    }
-                            
-                            st.text('Creating PDF report...')
-                            # Generate PDF with selected report type
-                            if report_type == "Visible Histograms Only":
-                                # Get the number of histograms from session state
-                                num_histograms = st.session_state.get("num_histograms", 6)
-                                # Get the selected columns for visible histograms
-                                visible_columns = [st.session_state.get(f'chart_{i}') for i in range(num_histograms)]
-                                visible_columns = [col for col in visible_columns if col and pd.api.types.is_numeric_dtype(df_filtered2[col])]
-                                pdf_path = create_pdf_report(df_filtered2, metrics_data1, metrics_data2, metrics_column1, metrics_column2, visible_columns)
-                            else:
-                                # Get all numeric columns
-                                all_numeric_columns = [col for col in df_filtered2.columns if pd.api.types.is_numeric_dtype(df_filtered2[col])]
-                                pdf_path = create_pdf_report(df_filtered2, metrics_data1, metrics_data2, metrics_column1, metrics_column2, all_numeric_columns)
-                            
-                            st.text('Preparing download...')
-                            # Create download button for PDF
-                            with open(pdf_path, "rb") as pdf_file:
-                                PDFbyte = pdf_file.read()
-                                
-                            st.session_state.pdf_ready = True
-                            st.session_state.pdf_data = PDFbyte
-                            
-                            # Clean up temporary file
-                            os.unlink(pdf_path)
-                            
+                with report_col2:
+                    if st.button('Generate PDF Report'):
+                        # Runs in the background; an unchanged report comes straight from the job cache
+                        st.session_state.pdf_job_key = report_key
+                        report_jobs.submit(report_key, build_report)
+                    
+                    pdf_job = report_jobs.get(st.session_state.get('pdf_job_key'))
+                    if pdf_job is not None:
+                        if not pdf_job.finished:
+                            # Drawn once per run; the end of the script reruns until the job is done
+                            st.progress(pdf_job.progress, text=pdf_job.message)
+                            poll_report_job = True
+                        elif pdf_job.error is not None:
+                            st.error(f'Error generating PDF report: {str(pdf_job.error)}')
+                        else:
+                            for warning in pdf_job.warnings:
+                                st.error(warning)
                             st.success('PDF report generated successfully!')
-                    except Exception as e:
-                        st.error(f'Error generating PDF report: {str(e)}')
-                        st.info('Please make sure you have installed the required package: pip install kaleido')
-            
-            with report_col3:
-                if 'pdf_ready' in st.session_state and st.session_state.pdf_ready:
-                    st.download_button(
-                        label="Download PDF Report",
-                        data=st.session_state.pdf_data,
-                        file_name="signal_analyzer_report.pdf",
-                        mime='application/octet-stream'
-                    )
-        else:
-            st.write("No data matches the selected filters")
+                
+                with report_col3:
+                    if pdf_job is not None and pdf_job.finished and pdf_job.error is None:
+                        st.download_button(
+                            label="Download PDF Report",
+                            data=pdf_job.result,
+                            file_name="signal_analyzer_report.pdf",
+                            mime='application/octet-stream'
+                        )
+            else:
+                st.write("No data matches the selected filters")
 
-    # Monte Carlo Analysis tab content
-    with tab2:
-        # Title and warning icon in the same line
-        st.markdown("""
+        # Monte Carlo Analysis tab content
+        with tab2:
+            # Title and warning icon in the same line
+            st.markdown("""
         <style>
         .tooltip {
             position: relative;
@@ -1056,214 +786,167 @@ if st.session_state.file_path:
             </span>
         </div>
         """, unsafe_allow_html=True)
-        
-        # Horizontal line with shadow
-        st.markdown("<hr>", unsafe_allow_html=True)
-        
-        try:
-            # Load the Excel file
-            data = pd.read_excel(st.session_state.file_path, engine='openpyxl')
-            
-            # Create columns for controls
-            col1, col2, col3, col4, col5 = st.columns(5)
-            
-            with col1:
-                # Dropdown to select the column for Monte Carlo simulation
-                selected_column = st.selectbox('Select column for Monte Carlo simulation', 
-                                             [col for col in data.columns if pd.api.types.is_numeric_dtype(data[col])])
-            
-            with col2:
-                # Distribution type selector
-                dist_type = st.selectbox('Distribution Type', 
-                                       ['Gaussian Normal', 'Student T', 'Raw Data'],
-                                       help='Select the distribution type for the simulation')
-            
-            with col3:
-                # Number of steps input
-                num_steps = st.number_input('Number of steps', min_value=10, max_value=1000, value=100)
-            
-            with col4:
-                # Initial value input
-                initial_value = st.number_input('Initial value', min_value=0.1, max_value=100.0, value=1.0, step=0.1)
             
-            with col5:
-                # Number of simulations input
-                num_simulations = st.number_input('Number of simulations', min_value=100, max_value=100000, value=10000, step=1000)
+            # Horizontal line with shadow
+            st.markdown("<hr>", unsafe_allow_html=True)
             
-            # Run simulation button in a new row
-            if st.button('Run Monte Carlo Simulation'):
-                with st.spinner('Running Monte Carlo simulation...'):
-                    # Extract the selected column data
-                    column_data = data[selected_column].dropna()
-                    
-                    def simulate_monte_carlo(num_simulations, dist_type):
-                        trajectories = []
+            try:
+                # Load the data file (same cached frame as the Signal Analyzer tab)
+                data = load_dataframe(st.session_state.file_name, sheet_name,
+                                      data=st.session_state.file_data, digest=st.session_state.file_digest, compact=compact_mode)
+                
+                # Create columns for controls
+                col1, col2, col3, col4, col5 = st.columns(5)
+                
+                with col1:
+                    # Dropdown to select the column for Monte Carlo simulation
+                    selected_column = st.selectbox('Select column for Monte Carlo simulation', 
+                                                 [col for col in data.columns if pd.api.types.is_numeric_dtype(data[col])])
+                
+                with col2:
+                    # Distribution type selector
+                    dist_type = st.selectbox('Distribution Type', 
+                                           ['Gaussian Normal', 'Student T', 'Raw Data'],
+                                           help='Select the distribution type for the simulation')
+                
+                with col3:
+                    # Number of steps input
+                    num_steps = st.number_input('Number of steps', min_value=10, max_value=1000, value=100)
+                
+                with col4:
+                    # Initial value input
+                    initial_value = st.number_input('Initial value', min_value=0.1, max_value=100.0, value=1.0, step=0.1)
+                
+                with col5:
+                    # Number of simulations input
+                    num_simulations = st.number_input('Number of simulations', min_value=100, max_value=10000000, value=10000, step=1000)
+                
+                # Create columns for the execution controls
+                engine_col1, engine_col2, engine_col3, engine_col4 = st.columns(4)
+                
+                with engine_col1:
+                    # Execution mode selector
+                    engine_mode = st.selectbox('Execution Mode',
+                                               ['Streaming (chunked)', 'Parallel (process pool)', 'In-memory'],
+                                               help='Streaming keeps memory bounded by running simulations in chunks; '
+                                                    'Parallel splits the chunks across worker processes; '
+                                                    'In-memory keeps every trajectory and is limited to 100,000 simulations')
+                
+                with engine_col2:
+                    # Number of worker processes for the parallel mode
+                    num_workers = st.number_input('Workers', min_value=1, max_value=os.cpu_count() or 1,
+                                                  value=os.cpu_count() or 1, step=1,
+                                                  disabled=engine_mode != 'Parallel (process pool)')
+                
+                with engine_col3:
+                    # Seed input so runs can be re-created exactly (same seed and worker count)
+                    seed = st.number_input('Seed', min_value=0, value=42, step=1,
+                                           help='The same seed and worker count reproduce the same results')
+                
+                with engine_col4:
+                    # Percentile bands to overlay on the plot
+                    selected_percentiles = st.multiselect('Percentile bands', [1, 5, 10, 25, 50, 75, 90, 95, 99], default=[5, 95])
+                
+                # Everything the results depend on
+                monte_carlo_key = (st.session_state.file_digest, sheet_name, compact_mode, selected_column, dist_type,
+                                   num_steps, initial_value, num_simulations, engine_mode,
+                                   num_workers if engine_mode == 'Parallel (process pool)' else None, seed,
+                                   tuple(selected_percentiles))
+                
+                # Run simulation button in a new row
+                if st.button('Run Monte Carlo Simulation'):
+                    with st.spinner('Running Monte Carlo simulation...'):
+                        # Extract the selected column data
+                        column_data = data[selected_column].dropna()
                         
-                        if dist_type == 'Gaussian Normal':
-                            # Fit Gaussian distribution to the data
-                            mu, sigma = norm.fit(column_data)
-                            
-                            for _ in range(num_simulations):
-                                steps = np.random.normal(mu, sigma, size=num_steps)
-                                trajectory = [initial_value]
-                                for step in steps:
-                                    trajectory.append(trajectory[-1] * (1 + step / 100))
-                                trajectories.append(trajectory)
-                                
-                        elif dist_type == 'Student T':
-                            # Fit Student's T distribution to the data
-                            df, loc, scale = t.fit(column_data)
-                            
-                            for _ in range(num_simulations):
-                                steps = t.rvs(df=df, loc=loc, scale=scale, size=num_steps)
-                                trajectory = [initial_value]
-                                for step in steps:
-                                    trajectory.append(trajectory[-1] * (1 + step / 100))
-                                trajectories.append(trajectory)
-                                
-                        else:  # Raw Data
-                            # Use bootstrap sampling from the actual data
-                            for _ in range(num_simulations):
-                                steps = np.random.choice(column_data, size=num_steps)
-                                trajectory = [initial_value]
-                                for step in steps:
-                                    trajectory.append(trajectory[-1] * (1 + step / 100))
-                                trajectories.append(trajectory)
+                        if engine_mode == 'In-memory' and num_simulations > 100000:
+                            st.warning('In-memory mode is limited to 100,000 simulations; running in streaming mode instead.')
+                            engine_mode = 'Streaming (chunked)'
                         
-                        return pd.DataFrame(trajectories).T
-                    
-                    # Run simulation with selected distribution type
-                    trajectories = simulate_monte_carlo(num_simulations, dist_type)
-                    
-                    # Calculate statistics
-                    mean_trajectory = trajectories.mean(axis=1)
-                    min_trajectory = trajectories.min(axis=1)
-                    max_trajectory = trajectories.max(axis=1)
-                    
-                    # Display statistics in a row above the plot
-                    stats_col1, stats_col2, stats_col3 = st.columns(3)
-                    
-                    with stats_col1:
-                        st.metric("Maximum Drawdown", f"{min_trajectory.min():.2f}")
-                    with stats_col2:
-                        st.metric("Median Value", f"{mean_trajectory.median():.2f}")
-                    with stats_col3:
-                        st.metric("Mean Value", f"{mean_trajectory.mean():.2f}")
-                    
-                    # Create the plot using plotly
-                    fig = go.Figure()
-                    
-                    # Add individual trajectories
-                    for i in range(min(100, num_simulations)):  # Show only first 100 trajectories
-                        fig.add_trace(go.Scatter(
-                            y=trajectories[i],
-                            mode='lines',
-                            line=dict(color='gray', width=0.5),
-                            opacity=0.1,
-                            showlegend=False
-                        ))
-                    
-                    # Add mean trajectory
-                    fig.add_trace(go.Scatter(
-                        y=mean_trajectory,
-                        mode='lines',
-                        name='Most Likely Range',
-                        line=dict(color='blue', width=2)
-                    ))
-                    
-                    # Add min and max trajectories
-                    fig.add_trace(go.Scatter(
-                        y=min_trajectory,
-                        mode='lines',
-                        name='Worst Case',
-                        line=dict(color='red', width=1, dash='dash')
-                    ))
-                    
-                    fig.add_trace(go.Scatter(
-                        y=max_trajectory,
-                        mode='lines',
-                        name='Best Case',
-                        line=dict(color='green', width=1, dash='dash')
-                    ))
-                    
-                    # Add area between min and max
-                    fig.add_trace(go.Scatter(
-                        x=list(range(len(min_trajectory))),
-                        y=min_trajectory,
-                        fill=None,
-                        mode='lines',
-                        line_color='rgba(0,0,0,0)',
-                        showlegend=False
-                    ))
-                    
-                    fig.add_trace(go.Scatter(
-                        x=list(range(len(max_trajectory))),
-                        y=max_trajectory,
-                        fill='tonexty',
-                        mode='lines',
-                        line_color='rgba(0,0,0,0)',
-                        fillcolor='rgba(0,0,255,0.2)',
-                        name='Range'
-                    ))
-                    
-                    #Update layout
-                    fig.update_layout(
-                        xaxis_title="Trade #",
-                        yaxis_title="Equity",
-                        showlegend=True,
-                        legend=dict(
-                            yanchor="top",
-                            y=0.99,
-                            xanchor="left",
-                            x=0.01
-                        ),
-                        height=600,
-                        margin=dict(l=50, r=50, t=50, b=50)
-                    )
-                    
-                    # Add grid
-                    fig.update_xaxes(showgrid=True, gridwidth=1, gridcolor='LightGrey')
-                    fig.update_yaxes(showgrid=True, gridwidth=1, gridcolor='LightGrey')
-                    
-                    # Display the plot
-                    container = st.container()
-                    with container:
-                        st.markdown('<div style="width: 80%; margin: 0 auto;">', unsafe_allow_html=True)
-                        st.plotly_chart(fig, use_container_width=True)
-                        st.markdown('</div>', unsafe_allow_html=True)
-        except Exception as e:
-            st.error(f"Error running Monte Carlo simulation: {str(e)}")
-else:
-    # Title and button in the same line when no file is selected
-    col1, col2 = st.columns([3, 1])
+                        # Run simulation with selected distribution type and calculate statistics
+                        monte_carlo_span = run_profile.begin(f'monte carlo: {engine_mode}', rows=num_simulations)
+                        if engine_mode == 'In-memory':
+                            trajectories = simulate_monte_carlo(column_data, num_simulations, num_steps, initial_value,
+                                                                dist_type, seed=int(seed))
+                            results = summarize_trajectories(trajectories, selected_percentiles)
+                            del trajectories
+                        elif engine_mode == 'Parallel (process pool)':
+                            results = simulate_monte_carlo_parallel(column_data, num_simulations, num_steps, initial_value,
+                                                                    dist_type, int(num_workers),
+                                                                    percentiles=selected_percentiles, seed=int(seed))
+                        else:
+                            results = simulate_monte_carlo_streaming(column_data, num_simulations, num_steps, initial_value,
+                                                                     dist_type, percentiles=selected_percentiles, seed=int(seed))
+                        run_profile.end(monte_carlo_span)
+                        
+                        # Keep the results (with only the plotted sample trajectories) so later runs redraw them
+                        st.session_state.monte_carlo = {'key': monte_carlo_key,
+                                                        'results': {**results, 'sample': results['sample'][:100]}}
+                
+                # Show the last results while the settings they were run with are unchanged: the button is only
+                # True for the run of the click, and other reruns (e.g. PDF job polls) would otherwise clear them
+                stored_results = st.session_state.get('monte_carlo')
+                if stored_results is not None and stored_results['key'] == monte_carlo_key:
+                    render_monte_carlo_results(stored_results['results'])
+            except Exception as e:
+                st.error(f"Error running Monte Carlo simulation: {str(e)}")
+    else:
+        # Title and button in the same line when no file is selected
+        col1, col2 = st.columns([3, 1])
 
-    with col1:
-        st.markdown("# **Signal Analyzer Dashboard**")
+        with col1:
+            st.markdown("# **Signal Analyzer Dashboard**")
 
-    with col2:
-        st.markdown('<div class="file-section">', unsafe_allow_html=True)
-        container = st.container()
-        with container:
-            if st.button('Select Excel file', key='select_file'):
-                file_path = get_file_path()
-                if file_path:
-                    st.session_state.file_path = file_path
+        with col2:
+            st.markdown('<div class="file-section">', unsafe_allow_html=True)
+            container = st.container()
+            with container:
+                if store_uploaded_file(upload_data_file('select_file')):
                     st.rerun()
-        st.markdown('</div>', unsafe_allow_html=True)
+            st.markdown('</div>', unsafe_allow_html=True)
 
-    # Horizontal line with shadow
-    st.markdown("<hr>", unsafe_allow_html=True)
+        # Horizontal line with shadow
+        st.markdown("<hr>", unsafe_allow_html=True)
 
-    # Show logo when no file is selected
-    try:
-        logo_base64 = get_image_base64(r"C:\Users\monau\Downloads\logo.png")
-        st.markdown(f"""
-            <div style='text-align: center; padding: 20px 0;'>
-                <img src='data:image/png;base64,{logo_base64}' alt='Logo' style='width: 80%; max-width: 1500px; object-fit: contain; border-radius: 15px;'>
-            </div>
-        """, unsafe_allow_html=True)
-    except Exception as e:
-        st.error(f"Error loading logo: {str(e)}")
+        # Show logo when no file is selected, served by URL through st.image instead of inlined
+        logo_path = resolve_asset('logo.png')
+        if logo_path:
+            with run_profile.span('logo'):
+                logo_png = asset_png(logo_path, max_size=1500)
+            _, logo_col, _ = st.columns([1, 8, 1])
+            with logo_col:
+                st.image(logo_png, use_column_width=True)
+
+    # Debug panel with the stage timings of this run (only with debug_mode)
+    if debug_mode:
+        run_profile.stop_capture()
+        with st.expander('Debug: stage timings'):
+            st.caption(f'Run {run_profile.run_id}: {run_profile.elapsed_ms():.0f} ms until this panel')
+            if run_profile.spans:
+                st.dataframe(pd.DataFrame([{
+                    'stage': '\u2003' * span['depth'] + span['name'],
+                    'ms': span['duration_ms'],
+                    'rows': span['rows'],
+                    'MB': span['bytes'] / 1024**2 if span['bytes'] else None,
+                } for span in run_profile.spans]), use_container_width=True, hide_index=True)
+            if run_profile.capture_report:
+                st.code(run_profile.capture_report)
+            debug_col1, debug_col2 = st.columns(2)
+            with debug_col1:
+                # The click itself triggers the rerun that gets profiled
+                st.button('Profile next rerun', on_click=lambda: st.session_state.update(profile_next_run=True))
+            with debug_col2:
+                st.download_button('Download spans (JSONL)', run_profile.to_jsonl(),
+                                   file_name=f'spans_{run_profile.run_id}.jsonl', mime='application/x-ndjson')
+        # SAD_PROFILE_LOG collects the spans of every run for offline analysis
+        if os.environ.get('SAD_PROFILE_LOG'):
+            run_profile.append_jsonl(os.environ['SAD_PROFILE_LOG'])
+
+    # Poll a running PDF report job only after the whole page has been drawn, so both tabs stay usable
+    # while it runs; any interaction during the pause simply starts the next run earlier
+    if poll_report_job:
+        time.sleep(REPORT_POLL_SECONDS)
+        st.rerun()
 
 # To run the code, use the following command in the terminal:
 # streamlit run FilteredData_v8.py
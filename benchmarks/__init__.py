@@ -0,0 +1 @@
+# Benchmark suite of the Signal Analyzer hot paths on synthetic signal tables, see benchmarks.run.
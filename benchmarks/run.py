@@ -0,0 +1,192 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+import statistics
+import numpy as np
+import pandas as pd
+from benchmarks.synthetic import NUMERIC_COLUMNS, make_signal_table
+from signal_analyzer.data_loader import FrameCache, encode_categoricals, load_dataframe
+from signal_analyzer.filters import FilteredView, evaluate_filters, range_filter, values_filter
+from signal_analyzer.metrics import compute_metrics
+from signal_analyzer.column_summary import compute_column_summary, compute_column_summaries
+from signal_analyzer.monte_carlo import simulate_monte_carlo, simulate_monte_carlo_streaming
+from signal_analyzer.pdf_report import build_pdf_report
+
+# Benchmarks of the hot paths on synthetic signal tables, run from the repository root:
+#
+#   python -m benchmarks.run --sizes 10k,100k,1m --output bench.json
+#   python -m benchmarks.run --sizes 10k --only filter,metrics --compare bench.json
+#
+# Every benchmark is timed --repeat times (setup excluded) and the results are written as JSON,
+# together with the commit and library versions, so two runs can be compared with --compare.
+# Data-size dependent groups run once per size; monte_carlo and pdf run once.
+
+GROUPS = ['load', 'filter', 'metrics', 'histogram', 'monte_carlo', 'pdf']
+SIZES = {'10k': 10_000, '100k': 100_000, '1m': 1_000_000, '10m': 10_000_000}
+
+# Filters of the benchmarked two-filter cascade: a numeric range and a symbol list
+FILTER_SPECS = [range_filter('R', 0.0, 5.0), values_filter('Symbol', [f'SYM{i:03d}' for i in range(10)])]
+
+# Function to time a benchmark: setup() returns the callable to time and is not timed itself
+def time_benchmark(setup, repeat):
+    timings = []
+    for _ in range(repeat):
+        run = setup()
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+    return {'min': min(timings), 'median': statistics.median(timings), 'repeat': repeat}
+
+# Function to yield the (group, name, params, setup) benchmarks of one data size
+def size_benchmarks(n_rows, work_dir, excel_max_rows):
+    df = encode_categoricals(make_signal_table(n_rows))
+    raw = make_signal_table(n_rows)
+
+    # Source files are written once per size, outside the timings
+    paths = {}
+    if n_rows <= excel_max_rows:
+        paths['excel'] = os.path.join(work_dir, f'signals_{n_rows}.xlsx')
+        raw.to_excel(paths['excel'], index=False)
+    paths['csv'] = os.path.join(work_dir, f'signals_{n_rows}.csv')
+    raw.to_csv(paths['csv'], index=False)
+    paths['parquet'] = os.path.join(work_dir, f'signals_{n_rows}.parquet')
+    raw.to_parquet(paths['parquet'], index=False)
+    del raw
+
+    # Cold loads: empty frame cache and empty sidecar directory every time
+    def cold_load(path):
+        def setup():
+            sidecar_dir = tempfile.mkdtemp(dir=work_dir)
+            return lambda: load_dataframe(path, cache=FrameCache(1 << 40), sidecar_dir=sidecar_dir)
+        return setup
+
+    for fmt, path in paths.items():
+        yield 'load', f'load_{fmt}', {}, cold_load(path)
+
+    # Warm restart: the sidecar written by a first parse is read back (memory-mapped Feather)
+    sidecar_source = paths.get('excel', paths['csv'])
+    sidecar_dir = tempfile.mkdtemp(dir=work_dir)
+    load_dataframe(sidecar_source, cache=FrameCache(1 << 40), sidecar_dir=sidecar_dir)
+    yield 'load', 'load_sidecar', {'source': os.path.splitext(sidecar_source)[1]}, \
+        lambda: (lambda: load_dataframe(sidecar_source, cache=FrameCache(1 << 40), sidecar_dir=sidecar_dir))
+
+    # Cold cascade builds the column indexes of a fresh frame, warm cascade reuses them
+    yield 'filter', 'filter_cascade_cold', {}, lambda: (lambda frame=df.copy(): evaluate_filters(frame, FILTER_SPECS))
+    evaluate_filters(df, FILTER_SPECS)
+    yield 'filter', 'filter_cascade_warm', {}, lambda: (lambda: evaluate_filters(df, FILTER_SPECS))
+
+    rows, _ = evaluate_filters(df, FILTER_SPECS)
+    yield 'metrics', 'metrics_two_columns', {}, \
+        lambda: (lambda view=FilteredView(df, rows): [compute_metrics(view[col]) for col in ('R', 'R2')])
+
+    yield 'histogram', 'histograms_12_charts', {}, \
+        lambda: (lambda view=FilteredView(df, rows): [compute_column_summary(view[col]) for col in NUMERIC_COLUMNS])
+    yield 'histogram', 'summaries_batch_12', {}, lambda: (lambda: compute_column_summaries(df, NUMERIC_COLUMNS, rows))
+
+# Function to yield the (group, name, params, setup) benchmarks that do not depend on the data size
+def fixed_benchmarks():
+    column_data = make_signal_table(10_000)['R'].to_numpy()
+    for num_simulations in (1_000, 10_000):
+        for dist_type in ('Raw Data', 'Gaussian Normal'):
+            yield 'monte_carlo', 'simulate_monte_carlo', {'simulations': num_simulations, 'steps': 252, 'dist': dist_type}, \
+                lambda n=num_simulations, d=dist_type: (lambda: simulate_monte_carlo(column_data, n, 252, 10000, d, seed=42))
+    yield 'monte_carlo', 'simulate_monte_carlo_streaming', {'simulations': 100_000, 'steps': 252, 'dist': 'Raw Data'}, \
+        lambda: (lambda: simulate_monte_carlo_streaming(column_data, 100_000, 252, 10000, 'Raw Data', percentiles=(5, 50, 95), seed=42))
+
+    df = make_signal_table(100_000)
+    summaries = compute_column_summaries(df, NUMERIC_COLUMNS)
+    for chart_format in ('png', 'vector'):
+        yield 'pdf', 'build_pdf_report', {'charts': len(NUMERIC_COLUMNS), 'format': chart_format}, \
+            lambda f=chart_format: (lambda: build_pdf_report(len(df), len(df), summaries['R']['metrics'], summaries['R2']['metrics'],
+                                                             'R', 'R2', NUMERIC_COLUMNS, summaries, chart_workers=1, chart_format=f))
+
+# Function to describe the environment a run was made in
+def run_metadata():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'machine': platform.machine(),
+        'cpus': os.cpu_count(),
+    }
+
+# Function to run the selected benchmarks; returns the list of result records
+def run_benchmarks(sizes, groups, repeat=3, excel_max_rows=100_000, log=print):
+    results = []
+    work_dir = tempfile.mkdtemp(prefix='sad_bench_')
+    try:
+        def record(group, name, params, setup, n_rows=None):
+            if group not in groups:
+                return
+            timing = time_benchmark(setup, repeat)
+            results.append({'group': group, 'benchmark': name, 'rows': n_rows, 'params': params, **timing})
+            log(f"{name:<32} {'' if n_rows is None else n_rows:>10} {json.dumps(params) if params else '':<60} "
+                f"min {timing['min'] * 1000:10.2f} ms")
+
+        for n_rows in sizes:
+            if groups & {'load', 'filter', 'metrics', 'histogram'}:
+                for group, name, params, setup in size_benchmarks(n_rows, work_dir, excel_max_rows):
+                    record(group, name, params, setup, n_rows)
+        if groups & {'monte_carlo', 'pdf'}:
+            for group, name, params, setup in fixed_benchmarks():
+                record(group, name, params, setup)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return results
+
+# Function to print the ratio of each benchmark to the same benchmark of a previous run
+def compare_results(results, baseline_path, log=print):
+    with open(baseline_path, encoding='utf-8') as baseline_file:
+        baseline = json.load(baseline_file)
+    key = lambda r: (r['benchmark'], r['rows'], json.dumps(r['params'], sort_keys=True))
+    previous = {key(r): r for r in baseline['results']}
+    log(f"\ncompared with {baseline_path} (commit {baseline['meta'].get('commit')}): new / old, min times")
+    for result in results:
+        old = previous.get(key(result))
+        if old:
+            log(f"{result['benchmark']:<32} {'' if result['rows'] is None else result['rows']:>10} "
+                f"{result['min'] / old['min']:8.2f}x")
+
+# Function to parse a size like 100k or 1m
+def parse_size(size):
+    return SIZES[size.lower()] if size.lower() in SIZES else int(size)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the Signal Analyzer hot paths on synthetic data.')
+    parser.add_argument('--sizes', default='10k,100k,1m', help='Row counts: 10k, 100k, 1m, 10m or integers (default: 10k,100k,1m)')
+    parser.add_argument('--only', default=','.join(GROUPS), help=f"Benchmark groups to run (default: {','.join(GROUPS)})")
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs per benchmark (default: 3)')
+    parser.add_argument('--excel-max-rows', type=int, default=100_000,
+                        help='Largest size the Excel load is benchmarked at, writing big workbooks is slow (default: 100000)')
+    parser.add_argument('--output', help='Write the results to this JSON file')
+    parser.add_argument('--compare', help='JSON results of a previous run to compare with')
+    args = parser.parse_args(argv)
+
+    groups = set(args.only.split(','))
+    unknown = groups - set(GROUPS)
+    if unknown:
+        parser.error(f"unknown benchmark groups: {', '.join(sorted(unknown))}")
+    sizes = [parse_size(size) for size in args.sizes.split(',')]
+
+    results = run_benchmarks(sizes, groups, args.repeat, args.excel_max_rows)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output_file:
+            json.dump({'meta': run_metadata(), 'results': results}, output_file, indent=2)
+    if args.compare:
+        compare_results(results, args.compare)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
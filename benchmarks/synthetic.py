@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+
+# Synthetic trade/signal tables shaped like the exports the app is used with: one row per trade,
+# a timestamp, low-cardinality text columns and a block of numeric result/feature columns.
+
+SYMBOLS = [f'SYM{i:03d}' for i in range(50)]
+SETUPS = ['Breakout', 'Pullback', 'Reversal', 'Range', 'Gap']
+
+# Numeric columns, enough for the 12-chart histogram grid
+NUMERIC_COLUMNS = ['R', 'R2', 'MFE', 'MAE', 'Entry', 'Exit', 'Qty', 'Duration', 'ATR', 'Volume', 'Score', 'Spread']
+
+# Function to build a synthetic signal table of n_rows rows (deterministic for a given seed)
+def make_signal_table(n_rows, seed=0):
+    rng = np.random.default_rng(seed)
+    r = rng.standard_t(4, n_rows) * 1.5 + 0.1
+    entry = rng.lognormal(4, 0.5, n_rows)
+    df = pd.DataFrame({
+        'Date': pd.Timestamp('2015-01-01') + pd.to_timedelta(np.sort(rng.integers(0, 10 * 365 * 24 * 3600, n_rows)), unit='s'),
+        'Symbol': rng.choice(SYMBOLS, n_rows),
+        'Side': rng.choice(['Long', 'Short'], n_rows),
+        'Setup': rng.choice(SETUPS, n_rows),
+        'R': r.round(2),
+        'R2': (r * 0.5 + rng.normal(0, 0.5, n_rows)).round(2),
+        'MFE': np.abs(r) + rng.exponential(1, n_rows),
+        'MAE': -rng.exponential(1, n_rows),
+        'Entry': entry,
+        'Exit': entry * (1 + r / 100),
+        'Qty': rng.integers(1, 1000, n_rows),
+        'Duration': rng.integers(1, 500, n_rows),
+        'ATR': rng.gamma(2, 0.5, n_rows),
+        'Volume': rng.integers(1000, 1000000, n_rows),
+        'Score': rng.uniform(0, 100, n_rows),
+        'Spread': rng.exponential(0.02, n_rows),
+    })
+    # A few missing results, as in real exports
+    df.loc[rng.random(n_rows) < 0.01, 'R2'] = np.nan
+    return df
@@ -0,0 +1,7 @@
+# Core library of the Signal Analyzer: loading, filtering, metrics, histogram binning, Monte Carlo
+# and PDF reports, with no Streamlit dependency. FilteredData_v19.py is the Streamlit front end and
+# signal_analyzer.batch_reports the headless one.
+#
+# Modules are imported directly (e.g. signal_analyzer.filters); nothing is re-exported here so that
+# importing one module does not pull in the heavier ones. scipy, matplotlib and reportlab are only
+# imported on the code paths that use them.
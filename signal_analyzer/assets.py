@@ -0,0 +1,55 @@
+import io
+import os
+import base64
+import threading
+
+# Image assets of the app (the logos). Names are resolved in the asset directory, which defaults to
+# assets/ next to the app and can be moved with SAD_ASSET_DIR; absolute paths are used as they are.
+# Each image is converted and encoded once per process and file version (path, mtime, size), so a
+# rerun only does a stat call.
+
+ASSET_DIR = os.environ.get('SAD_ASSET_DIR', os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'assets'))
+
+_encoded = {}
+_lock = threading.Lock()
+
+# Function to resolve an asset name or path (None if the file does not exist)
+def resolve_asset(name, asset_dir=ASSET_DIR):
+    path = name if os.path.isabs(name) else os.path.join(asset_dir, name)
+    return path if os.path.isfile(path) else None
+
+# Function to get the encoded versions of an image: PNG bytes (RGBA converted to RGB, downscaled to
+# fit max_size x max_size pixels if given) and their base64 text, computed on first use
+def _encoded_asset(path, max_size=None):
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size, max_size)
+    with _lock:
+        entry = _encoded.get(key)
+    if entry is None:
+        from PIL import Image
+        with Image.open(path) as img:
+            # Convert to RGB if image is in RGBA format
+            if img.mode == 'RGBA':
+                img = img.convert('RGB')
+            if max_size:
+                img.thumbnail((max_size, max_size))
+            buffer = io.BytesIO()
+            img.save(buffer, format='PNG')
+        entry = {'png': buffer.getvalue(), 'base64': None}
+        with _lock:
+            # Drop older versions of the same file
+            for stale_key in [k for k in _encoded if k[0] == key[0] and k[3] == max_size]:
+                del _encoded[stale_key]
+            _encoded[key] = entry
+    return entry
+
+# Function to get the PNG bytes of an image asset (for st.image, which serves them by URL)
+def asset_png(path, max_size=None):
+    return _encoded_asset(path, max_size)['png']
+
+# Function to get the base64 PNG of an image asset (for small images inlined in HTML)
+def asset_base64(path, max_size=None):
+    entry = _encoded_asset(path, max_size)
+    if entry['base64'] is None:
+        entry['base64'] = base64.b64encode(entry['png']).decode()
+    return entry['base64']
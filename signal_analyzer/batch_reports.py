@@ -0,0 +1,166 @@
+import os
+import re
+import sys
+import json
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import pandas as pd
+from .data_loader import load_dataframe
+from .filters import evaluate_filters, range_filter, values_filter
+from .column_summary import compute_column_summaries
+from .pdf_report import build_pdf_report
+from .report_charts import DEFAULT_CHART_DPI
+
+# Headless batch reports: every input file x every filter preset, without the Streamlit UI.
+# Each dataset is loaded once and each preset is reduced to row counts, metrics and column
+# summaries in the main process; only those small results are shipped to the worker processes,
+# which render the charts and build the PDFs.
+#
+#   python -m signal_analyzer.batch_reports --presets presets.json --output-dir reports signals/*.xlsx
+#
+# (run from the repository root, or with the repository on PYTHONPATH)
+#
+# The preset file is a JSON list of presets (or {"presets": [...]}):
+#   {
+#     "name": "longs_2024",
+#     "sheet": "Sheet1",                              optional, first sheet by default
+#     "filters": [
+#       {"column": "R", "min": -1, "max": 5},          numeric or date range, either bound optional
+#       {"column": "R", "min": 0, "include_min": false},
+#       {"column": "Date", "min": "2024-01-01", "max": "2024-12-31"},
+#       {"column": "Sym", "values": ["AAA", "BBB"]}
+#     ],
+#     "metrics_columns": ["R", "R2"],                 optional, the metrics tables need both
+#     "chart_columns": ["R", "R2"],                   or "all" (default) for every numeric column
+#     "chart_format": "png",                          or "vector"
+#     "dpi": 150
+#   }
+
+# Function to read the presets of a preset file
+def load_presets(path):
+    with open(path, encoding='utf-8') as preset_file:
+        presets = json.load(preset_file)
+    if isinstance(presets, dict):
+        presets = presets['presets']
+    for number, preset in enumerate(presets, start=1):
+        preset.setdefault('name', f'preset_{number}')
+    return presets
+
+# Function to turn the filters of a preset into filter specs (missing bounds are the column min/max)
+def preset_filter_specs(df, preset):
+    specs = []
+    for spec in preset.get('filters', []):
+        column = spec['column']
+        if column not in df.columns:
+            raise ValueError(f"Preset '{preset['name']}' filters on unknown column '{column}'")
+        if 'values' in spec:
+            specs.append(values_filter(column, spec['values']))
+            continue
+        convert = pd.Timestamp if pd.api.types.is_datetime64_any_dtype(df[column]) else float
+        low = convert(spec['min']) if spec.get('min') is not None else df[column].min()
+        high = convert(spec['max']) if spec.get('max') is not None else df[column].max()
+        specs.append(range_filter(column, low, high, spec.get('include_min', True), spec.get('include_max', True)))
+    return specs
+
+# Function to reduce one preset of a loaded dataset to the arguments of build_pdf_report
+def prepare_report(df, preset, chart_workers=1):
+    filter_specs = preset_filter_specs(df, preset)
+    rows, counts = evaluate_filters(df, filter_specs)
+    filtered_rows = counts[-1] if counts else len(df)
+
+    numeric_columns = [col for col in df.columns if pd.api.types.is_numeric_dtype(df[col])]
+    chart_columns = preset.get('chart_columns', 'all')
+    chart_columns = numeric_columns if chart_columns == 'all' else [col for col in chart_columns if col in numeric_columns]
+    metrics_columns = list(preset.get('metrics_columns') or [None, None])[:2]
+    metrics_columns += [None] * (2 - len(metrics_columns))
+
+    summary_columns = list(dict.fromkeys(chart_columns + [col for col in metrics_columns if col in numeric_columns]))
+    column_summaries = compute_column_summaries(df, summary_columns, rows)
+    metrics_data = [column_summaries[col]['metrics'] if col in column_summaries and filtered_rows else None
+                    for col in metrics_columns]
+
+    return dict(
+        total_rows=len(df),
+        filtered_rows=filtered_rows,
+        metrics_data1=metrics_data[0],
+        metrics_data2=metrics_data[1],
+        selected_column1=metrics_columns[0] or '',
+        selected_column2=metrics_columns[1] or '',
+        chart_columns=chart_columns,
+        column_summaries={col: column_summaries[col] for col in chart_columns},
+        filter_specs=filter_specs,
+        filter_counts=counts,
+        chart_dpi=preset.get('dpi', DEFAULT_CHART_DPI),
+        chart_workers=chart_workers,
+        chart_format=preset.get('chart_format', 'png'),
+    )
+
+# Function to build one report in a worker process and write it to output_path
+def write_report(output_path, report_args):
+    pdf_bytes, warnings = build_pdf_report(**report_args)
+    with open(output_path, 'wb') as pdf_file:
+        pdf_file.write(pdf_bytes)
+    return output_path, warnings
+
+# Function to get the PDF path of a file x preset pair
+def report_path(output_dir, file_path, preset):
+    # The extension stays in the name, so data.xlsx and data.csv do not overwrite each other
+    name = re.sub(r'[<>:"/\\|?*\s]+', '_', f"{os.path.basename(file_path)}__{preset['name']}")
+    return os.path.join(output_dir, f'{name}.pdf')
+
+# Function to build the reports of every file x preset pair; returns the number of failed reports
+def run_batch(files, presets, output_dir, num_workers=None, compact=False, log=print):
+    os.makedirs(output_dir, exist_ok=True)
+    num_workers = max(1, num_workers or os.cpu_count() or 1)
+    failures = 0
+
+    # Presets are grouped by sheet so each sheet of a file is parsed once
+    by_sheet = {}
+    for preset in presets:
+        by_sheet.setdefault(preset.get('sheet'), []).append(preset)
+
+    with ProcessPoolExecutor(max_workers=num_workers) as executor:
+        futures = {}
+        for file_path in files:
+            for sheet_name, sheet_presets in by_sheet.items():
+                try:
+                    df = load_dataframe(file_path, sheet_name=sheet_name, compact=compact)
+                except Exception as e:
+                    log(f'FAILED {file_path} [{sheet_name or "first sheet"}]: {e}')
+                    failures += len(sheet_presets)
+                    continue
+                for preset in sheet_presets:
+                    output_path = report_path(output_dir, file_path, preset)
+                    try:
+                        report_args = prepare_report(df, preset)
+                    except Exception as e:
+                        log(f'FAILED {output_path}: {e}')
+                        failures += 1
+                        continue
+                    futures[executor.submit(write_report, output_path, report_args)] = output_path
+
+        for future in as_completed(futures):
+            try:
+                output_path, warnings = future.result()
+                log(f'wrote {output_path}')
+                for warning in warnings:
+                    log(f'  warning: {warning}')
+            except Exception as e:
+                log(f'FAILED {futures[future]}: {e}')
+                failures += 1
+    return failures
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Build Signal Analyzer PDF reports for many files and filter presets.')
+    parser.add_argument('files', nargs='+', help='Data files (.xlsx, .xlsm, .csv, .parquet)')
+    parser.add_argument('--presets', required=True, help='JSON file with the filter presets')
+    parser.add_argument('--output-dir', default='reports', help='Directory the PDFs are written to (default: reports)')
+    parser.add_argument('--workers', type=int, default=None, help='Report worker processes (default: number of CPUs)')
+    parser.add_argument('--compact', action='store_true', help='Load the data in compact memory mode')
+    args = parser.parse_args(argv)
+
+    failures = run_batch(args.files, load_presets(args.presets), args.output_dir, args.workers, args.compact)
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,118 @@
+import threading
+import numpy as np
+from collections import OrderedDict
+from .histograms import freedman_diaconis_edges, histogram_counts, sorted_percentile, sorted_valid_values
+from .metrics import metrics_from_sorted
+
+# Per-(filter state, column) summaries shared by the histogram grid, the metrics panels and the
+# PDF report. A column is sorted once per filter state; min, max, quartiles, the Freedman-Diaconis
+# bins and the trade metrics are all read from that one sorted copy, which is then dropped so the
+# cache only holds the small results.
+
+# Function to summarize a numeric column:
+#   total / count    rows, and rows that are not NaN
+#   min, max, q1, q3 NaN if the column has no values
+#   edges / counts   Freedman-Diaconis histogram (None if the data is constant or empty)
+#   metrics          the trade metrics of metrics.compute_metrics
+def compute_column_summary(values):
+    return summarize_sorted(*sorted_valid_values(values))
+
+# Function to build the summary from the sorted non-NaN values and the row count of a column
+def summarize_sorted(valid, total):
+    summary = {
+        'total': total,
+        'count': len(valid),
+        'min': float('nan'),
+        'max': float('nan'),
+        'q1': float('nan'),
+        'q3': float('nan'),
+        'edges': None,
+        'counts': None,
+        'metrics': metrics_from_sorted(valid, total),
+    }
+    if len(valid):
+        summary['min'], summary['max'] = valid[0], valid[-1]
+        summary['q1'], summary['q3'] = sorted_percentile(valid, 25), sorted_percentile(valid, 75)
+        edges = freedman_diaconis_edges(valid[0], valid[-1], summary['q1'], summary['q3'], total)
+        if edges is not None:
+            summary['edges'] = edges
+            summary['counts'] = histogram_counts(valid, edges)
+    return summary
+
+# Size budget of the block compute_column_summaries sorts at once
+DEFAULT_BLOCK_BYTES = 64 * 1024 * 1024
+
+# Function to summarize many numeric columns of a frame at once (e.g. the "All Numeric Columns" report).
+# Columns are gathered into (columns x rows) float64 blocks of at most block_bytes (but at least one
+# column), each sorted in a single call; NaN sorts to the end of each row, so the non-NaN values
+# of a column are a contiguous prefix and every statistic reads a view of the block.
+def compute_column_summaries(df, columns, rows=None, block_bytes=DEFAULT_BLOCK_BYTES):
+    summaries = {}
+    n_rows = len(df) if rows is None else len(rows)
+    batch_size = max(1, block_bytes // max(1, n_rows * 8))
+    for start in range(0, len(columns), batch_size):
+        batch = list(columns[start:start + batch_size])
+        # Gather column by column: each row of the block is one contiguous take from the column
+        block = np.empty((len(batch), n_rows))
+        for i, column in enumerate(batch):
+            values = df[column].to_numpy(dtype=np.float64, na_value=np.nan)
+            if rows is None:
+                block[i] = values
+            else:
+                np.take(values, rows, out=block[i])
+        block.sort(axis=1)
+        valid_counts = block.shape[1] - np.isnan(block).sum(axis=1)
+        for i, column in enumerate(batch):
+            summaries[column] = summarize_sorted(block[i, :valid_counts[i]], n_rows)
+        # Free the block before the next one is allocated, so only one block is alive at a time
+        del block
+    return summaries
+
+# Bounded LRU of computed summaries
+class SummaryCache:
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            summary = self._entries.get(key)
+            if summary is not None:
+                self._entries.move_to_end(key)
+            return summary
+
+    def put(self, key, summary):
+        with self._lock:
+            self._entries[key] = summary
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+summary_cache = SummaryCache()
+
+# Function to get the summary of a filtered column, computed only when the key is new.
+# The key must identify the dataset, every filter setting and the column, e.g.
+# ((file digest, sheet, compact mode), filter specs, column). values may be a zero-argument
+# callable so the column is only sliced on a cache miss.
+def cached_summary(key, values, cache=summary_cache):
+    summary = cache.get(key)
+    if summary is None:
+        summary = compute_column_summary(values() if callable(values) else values)
+        cache.put(key, summary)
+    return summary
+
+# Function to get the metrics of a filtered column through the summary cache
+def cached_metrics(key, values, cache=summary_cache):
+    return cached_summary(key, values, cache)['metrics']
+
+# Function to get the summaries of several columns, batch-computing only the ones not cached yet.
+# key identifies the dataset and the filter settings; the column is appended to it per entry.
+def cached_summaries(key, df, columns, rows=None, cache=summary_cache):
+    summaries = {column: cache.get(key + (column,)) for column in columns}
+    missing = [column for column, summary in summaries.items() if summary is None]
+    if missing:
+        for column, summary in compute_column_summaries(df, missing, rows).items():
+            cache.put(key + (column,), summary)
+            summaries[column] = summary
+    return summaries
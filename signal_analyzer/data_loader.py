@@ -0,0 +1,273 @@
+import io
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # pyarrow is optional, without it every cold start goes through openpyxl
+    pa = None
+    feather = None
+
+# Parsed-frame cache shared by both tabs, every rerun and every session of the Streamlit app.
+# Entries are keyed on (path, mtime, size, sheet, columns) so an edited file is parsed again, and the least
+# recently used frames are evicted once the memory budget is exceeded.
+# Cached frames are shared objects: callers must copy before mutating them.
+
+DEFAULT_CACHE_BUDGET_MB = int(os.environ.get('SAD_CACHE_BUDGET_MB', 2048))
+
+# Columnar sidecars survive server restarts: the first parse of a workbook is written as an
+# uncompressed Feather file, which later loads memory-mapped instead of going through openpyxl.
+# The source mtime and size are stored in the schema metadata and checked on every read.
+SIDECAR_DIR = os.environ.get('SAD_SIDECAR_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'signal_analyzer'))
+
+# Uploads get sidecars too, keyed by the SHA-256 digest of their bytes, so a restarted server or a new
+# session skips openpyxl for a file seen before. This leaves a copy of the uploaded data in SIDECAR_DIR:
+# set SAD_UPLOAD_SIDECARS=0 to keep uploads in memory only (the default is 1).
+UPLOAD_SIDECARS = os.environ.get('SAD_UPLOAD_SIDECARS', '1') != '0'
+
+class FrameCache:
+    def __init__(self, budget_bytes):
+        self.budget_bytes = budget_bytes
+        self.current_bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key, frame):
+        nbytes = int(frame.memory_usage(deep=True).sum())
+        with self._lock:
+            # Drop older versions of the same file, they can never be hit again
+            for stale_key in [k for k in self._entries if k[0] == key[0] and k[1:3] != key[1:3]]:
+                self._discard(stale_key)
+            if key in self._entries:
+                self._discard(key)
+            self._entries[key] = (frame, nbytes)
+            self.current_bytes += nbytes
+            # Evict least recently used entries, but always keep the one just added
+            while self.current_bytes > self.budget_bytes and len(self._entries) > 1:
+                self._discard(next(iter(self._entries)))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def _discard(self, key):
+        _, nbytes = self._entries.pop(key)
+        self.current_bytes -= nbytes
+
+frame_cache = FrameCache(DEFAULT_CACHE_BUDGET_MB * 1024 * 1024)
+
+# Function to build the cache key of a file on disk
+def file_cache_key(file_path):
+    stat = os.stat(file_path)
+    return (os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size)
+
+# Function to hash uploaded bytes, so identical uploads share one cache entry across sessions
+def content_digest(data):
+    return hashlib.sha256(data).hexdigest()
+
+# Function to build the cache key of an upload (file on disk if data is None)
+def source_cache_key(file_path, data=None, digest=None):
+    if data is None:
+        return file_cache_key(file_path)
+    return (f'sha256:{digest or content_digest(data)}', 0, len(data))
+
+# Function to read one sheet of an Excel workbook (readers accept a path or a file-like object)
+def read_excel_file(file_path, sheet_name=None, columns=None):
+    return pd.read_excel(file_path, sheet_name=sheet_name if sheet_name is not None else 0,
+                         usecols=columns, engine='openpyxl')
+
+# Function to read a CSV file with the pyarrow engine (C engine if pyarrow is missing)
+def read_csv_file(file_path, sheet_name=None, columns=None):
+    df = pd.read_csv(file_path, usecols=columns, engine='pyarrow' if pa is not None else 'c')
+    # Excel gives native datetime columns, CSV gives strings: parse them so the date filters still apply
+    return parse_date_columns(df)
+
+# Function to read a Parquet file, projecting only the requested columns
+def read_parquet_file(file_path, sheet_name=None, columns=None):
+    return pd.read_parquet(file_path, columns=columns)
+
+# Readers by file extension; sidecars are only worth writing for row-oriented formats
+READERS = {
+    '.xlsx': read_excel_file,
+    '.xlsm': read_excel_file,
+    '.csv': read_csv_file,
+    '.parquet': read_parquet_file,
+}
+SIDECAR_EXTENSIONS = {'.xlsx', '.xlsm', '.csv'}
+
+# Function to plug in a reader for another file extension
+def register_reader(extension, reader, sidecar=False):
+    READERS[extension.lower()] = reader
+    if sidecar:
+        SIDECAR_EXTENSIONS.add(extension.lower())
+    else:
+        SIDECAR_EXTENSIONS.discard(extension.lower())
+
+# Function to get the reader of a file from its extension
+def get_reader(file_path):
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension not in READERS:
+        raise ValueError(f"Unsupported file type '{extension}', expected one of: {', '.join(sorted(READERS))}")
+    return READERS[extension]
+
+# Function to convert text columns that hold dates into datetime columns
+def parse_date_columns(df):
+    for column in df.columns:
+        if df[column].dtype != object and not pd.api.types.is_string_dtype(df[column]):
+            continue
+        sample = df[column].dropna().head(100)
+        if sample.empty:
+            continue
+        try:
+            pd.to_datetime(sample, format='ISO8601')
+            df[column] = pd.to_datetime(df[column], format='ISO8601')
+        except (ValueError, TypeError):
+            continue
+    return df
+
+_sheet_names = {}
+
+# Function to dictionary-encode low-cardinality text columns as pandas categoricals, so the
+# multiselect filters work on integer codes instead of hashing strings on every rerun
+def encode_categoricals(df, max_unique_ratio=0.5):
+    for column in df.columns:
+        series = df[column]
+        if series.dtype != object and not isinstance(series.dtype, pd.StringDtype):
+            continue
+        if series.nunique(dropna=True) <= max_unique_ratio * len(series):
+            df[column] = series.astype('category')
+    return df
+
+# Function to shrink a frame for the optional compact mode: integers are downcast to the smallest
+# type that holds their range, float64 columns to float32 only when every value survives the round
+# trip (e.g. whole numbers stored as floats because of NaN), and text dates are parsed to datetimes.
+# Every downcast is lossless, so filters and metrics give exactly the full-precision results.
+def compact_dataframe(df):
+    df = parse_date_columns(df)
+    for column in df.columns:
+        series = df[column]
+        if pd.api.types.is_bool_dtype(series) or not pd.api.types.is_numeric_dtype(series):
+            continue
+        if pd.api.types.is_integer_dtype(series):
+            df[column] = pd.to_numeric(series, downcast='integer')
+        elif series.dtype == np.float64:
+            values = series.to_numpy()
+            # Out-of-range values overflow to inf and extra digits are rounded off, both fail the check
+            with np.errstate(over='ignore'):
+                downcast = values.astype(np.float32)
+            if np.array_equal(downcast.astype(np.float64), values, equal_nan=True):
+                df[column] = pd.Series(downcast, index=series.index, name=column)
+    return df
+
+# Function to get the deep memory footprint of a frame in bytes
+def memory_footprint(df):
+    return int(df.memory_usage(deep=True).sum())
+
+# Function to list the sheets of an Excel workbook (a single entry for other file types)
+def list_sheets(file_path, data=None, digest=None):
+    if get_reader(file_path) is not read_excel_file:
+        return [None]
+    key = source_cache_key(file_path, data, digest)
+    if key not in _sheet_names:
+        with pd.ExcelFile(io.BytesIO(data) if data is not None else file_path, engine='openpyxl') as workbook:
+            _sheet_names[key] = workbook.sheet_names
+    return list(_sheet_names[key])
+
+# Function to get the sidecar path of a source file
+def sidecar_path(key, sidecar_dir=SIDECAR_DIR):
+    name = hashlib.sha1(repr((key[0],) + key[3:]).encode('utf-8')).hexdigest()
+    return os.path.join(sidecar_dir, f'{name}.feather')
+
+# Function to read a sidecar if it exists and still matches the source file.
+# Returns the frame and the footprint of the frame as originally parsed, or (None, None).
+def read_sidecar(key, sidecar_dir=SIDECAR_DIR):
+    if feather is None:
+        return None, None
+    path = sidecar_path(key, sidecar_dir)
+    if not os.path.exists(path):
+        return None, None
+    try:
+        table = feather.read_table(path, memory_map=True)
+        metadata = table.schema.metadata or {}
+        if (metadata.get(b'source_mtime_ns') != str(key[1]).encode()
+                or metadata.get(b'source_size') != str(key[2]).encode()):
+            return None, None
+        parsed_bytes = metadata.get(b'parsed_bytes')
+        return table.to_pandas(), int(parsed_bytes) if parsed_bytes else None
+    except (OSError, pa.ArrowException):
+        return None, None
+
+# Function to write the sidecar of a freshly parsed frame (skipped if the frame is not Arrow-compatible)
+def write_sidecar(key, df, sidecar_dir=SIDECAR_DIR, parsed_bytes=None):
+    if feather is None:
+        return
+    path = sidecar_path(key, sidecar_dir)
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        table = table.replace_schema_metadata({
+            **(table.schema.metadata or {}),
+            b'source_path': key[0].encode('utf-8'),
+            b'source_mtime_ns': str(key[1]).encode(),
+            b'source_size': str(key[2]).encode(),
+            b'parsed_bytes': str(parsed_bytes or '').encode(),
+        })
+        os.makedirs(sidecar_dir, exist_ok=True)
+        # Write to a temporary file first so a concurrent reader never sees a partial sidecar
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        feather.write_feather(table, tmp_path, compression='uncompressed')
+        os.replace(tmp_path, path)
+    except (OSError, TypeError, ValueError, pa.ArrowException):
+        pass
+
+# Footprints of the loaded frames by load key: (bytes as parsed, bytes as served)
+frame_footprints = {}
+
+# Function to build the load key: source, sheet, projected columns and compact mode
+def load_cache_key(file_path, sheet_name=None, columns=None, data=None, digest=None, compact=False):
+    columns = tuple(columns) if columns is not None else None
+    return source_cache_key(file_path, data, digest) + (sheet_name, columns, compact)
+
+# Function to read a data file once and serve the parsed frame from the caches afterwards.
+# Uploads pass their bytes as data (file_path is then only the file name, used to pick the reader)
+# and are parsed straight from an in-memory buffer; their sidecars follow upload_sidecars.
+def load_dataframe(file_path, sheet_name=None, columns=None, cache=frame_cache, sidecar_dir=SIDECAR_DIR,
+                   data=None, digest=None, compact=False, upload_sidecars=UPLOAD_SIDECARS):
+    reader = get_reader(file_path)
+    columns = list(columns) if columns is not None else None
+    key = load_cache_key(file_path, sheet_name, columns, data, digest, compact)
+    df = cache.get(key)
+    if df is None:
+        use_sidecar = ((data is None or upload_sidecars)
+                       and os.path.splitext(file_path)[1].lower() in SIDECAR_EXTENSIONS)
+        df, parsed_bytes = read_sidecar(key, sidecar_dir) if use_sidecar else (None, None)
+        if df is None:
+            # BytesIO over bytes shares the buffer instead of copying it
+            source = io.BytesIO(data) if data is not None else file_path
+            df = reader(source, sheet_name=sheet_name, columns=columns)
+            parsed_bytes = memory_footprint(df)
+            df = encode_categoricals(df)
+            if compact:
+                df = compact_dataframe(df)
+            if use_sidecar:
+                write_sidecar(key, df, sidecar_dir, parsed_bytes)
+        frame_footprints[key] = (parsed_bytes, memory_footprint(df))
+        cache.put(key, df)
+    return df
+
+# Function to get the (bytes as parsed, bytes as served) footprint of a loaded frame
+def get_footprint(file_path, sheet_name=None, columns=None, data=None, digest=None, compact=False):
+    return frame_footprints.get(load_cache_key(file_path, sheet_name, columns, data, digest, compact), (None, None))
@@ -0,0 +1,189 @@
+import string
+import threading
+import weakref
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+# Sorted-column indexes for the numeric and date range filters. A column is sorted once (lazily,
+# on first use) and every later range query is two binary searches: the matching rows are a
+# contiguous slice of the argsort and the match count is the slice length.
+# Indexes are kept per frame for as long as the frame is alive, so they assume the frame is not
+# mutated, which holds for the frames served by data_loader.
+
+class ColumnIndex:
+    def __init__(self, series):
+        if pd.api.types.is_datetime64_any_dtype(series):
+            values = series.to_numpy(dtype='datetime64[ns]')
+            valid_count = len(values) - np.isnat(values).sum()
+        else:
+            values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+            valid_count = len(values) - np.isnan(values).sum()
+        # NaN and NaT sort to the end, so the valid values are the head of the sorted array
+        self.order = np.argsort(values, kind='stable')
+        self.sorted_values = values[self.order[:valid_count]]
+
+    def bounds(self, low, high, include_low=True, include_high=True):
+        low = np.asarray(low, dtype=self.sorted_values.dtype)
+        high = np.asarray(high, dtype=self.sorted_values.dtype)
+        lo = int(np.searchsorted(self.sorted_values, low, side='left' if include_low else 'right'))
+        hi = int(np.searchsorted(self.sorted_values, high, side='right' if include_high else 'left'))
+        return lo, max(lo, hi)
+
+    def mask(self, low, high, include_low=True, include_high=True):
+        lo, hi = self.bounds(low, high, include_low, include_high)
+        mask = np.zeros(len(self.order), dtype=bool)
+        mask[self.order[lo:hi]] = True
+        return mask
+
+# Value index of a categorical column: the integer category codes, so a multiselect filter is a
+# lookup table over the codes instead of a string isin
+class CategoryIndex:
+    def __init__(self, series):
+        self.categories = series.cat.categories
+        self.codes = series.cat.codes.to_numpy()
+
+    def selected_codes(self, values):
+        return self.categories.get_indexer(list(values))
+
+    def mask(self, values):
+        lookup = np.zeros(len(self.categories) + 1, dtype=bool)
+        codes = self.selected_codes(values)
+        lookup[codes[codes >= 0]] = True
+        # Code -1 (missing) reads the extra last slot, which is never selected
+        return lookup[self.codes]
+
+_indexes = {}
+_lock = threading.Lock()
+
+# Function to get (building it on first use) an index of a frame
+def _get_index(df, key, build):
+    frame_key = id(df)
+    with _lock:
+        frame_indexes = _indexes.get(frame_key)
+        if frame_indexes is None:
+            frame_indexes = _indexes[frame_key] = {}
+            weakref.finalize(df, _indexes.pop, frame_key, None)
+        index = frame_indexes.get(key)
+    if index is None:
+        index = build()
+        with _lock:
+            frame_indexes[key] = index
+    return index
+
+# Function to get the sorted index of a numeric or date column
+def get_column_index(df, column):
+    return _get_index(df, ('sorted', column), lambda: ColumnIndex(df[column]))
+
+# Function to get the value index of a categorical column
+def get_category_index(df, column):
+    return _get_index(df, ('category', column), lambda: CategoryIndex(df[column]))
+
+# Function to get the options of a multiselect filter (categories come straight from the index)
+def column_values(df, column):
+    if isinstance(df[column].dtype, pd.CategoricalDtype):
+        return list(get_category_index(df, column).categories)
+    return df[column].unique()
+
+# Filter specs are hashable tuples, so a list of them can key the metrics cache:
+#   ('range', column, low, high, include_low, include_high) for numeric and date columns
+#   ('in', column, values) for any other column
+# A filter that selects every row is None.
+
+# Function to build a range filter spec
+def range_filter(column, low, high, include_low=True, include_high=True):
+    return ('range', column, low, high, include_low, include_high)
+
+# Function to build a value-list filter spec (None if no value is selected)
+def values_filter(column, values):
+    return ('in', column, tuple(values)) if len(values) else None
+
+# Function to get the boolean row mask of one filter spec
+def filter_mask(df, spec):
+    kind, column = spec[0], spec[1]
+    if kind == 'range':
+        return get_column_index(df, column).mask(*spec[2:])
+    if kind == 'in':
+        if isinstance(df[column].dtype, pd.CategoricalDtype):
+            return get_category_index(df, column).mask(spec[2])
+        return df[column].isin(spec[2]).to_numpy(dtype=bool)
+    raise ValueError(f"Unknown filter kind '{kind}'")
+
+# Function to evaluate a list of filter specs against one shared row mask.
+# Returns the matching row positions (None if no filter applies) and the number of rows left after
+# each filter, from which the conditional probability chain P(A), P(B|A), P(C|A,B)... is derived.
+def evaluate_filters(df, specs):
+    mask = None
+    counts = []
+    for spec in specs:
+        if spec is not None:
+            if mask is None:
+                mask = filter_mask(df, spec)
+            else:
+                mask &= filter_mask(df, spec)
+        counts.append(int(np.count_nonzero(mask)) if mask is not None else len(df))
+    rows = np.flatnonzero(mask) if mask is not None else None
+    return rows, counts
+
+# Letters naming the filters in the probability chain: filter A, filter B, ...
+FILTER_LETTERS = string.ascii_uppercase
+
+# Function to format a range bound the way the filter widgets show it
+def _format_bound(value):
+    if isinstance(value, (datetime, np.datetime64)):
+        return pd.Timestamp(value).strftime('%Y-%m-%d')
+    return f'{value:.2f}'
+
+# Function to describe a filter spec in words, e.g. 'R in [0.00, 5.00)' or 'Symbol in AAPL, MSFT'
+def describe_filter(spec):
+    if spec is None:
+        return 'All rows'
+    kind, column = spec[0], spec[1]
+    if kind == 'range':
+        low, high, include_low, include_high = spec[2:]
+        return (f"{column} in {'[' if include_low else '('}{_format_bound(low)}, "
+                f"{_format_bound(high)}{']' if include_high else ')'}")
+    return f"{column} in {', '.join(str(value) for value in spec[2])}"
+
+# Function to turn the per-filter row counts into (joint, conditional) probabilities in percent
+def probability_chain(counts, total_rows):
+    chain = []
+    previous = total_rows
+    for count in counts:
+        joint = (count / total_rows) * 100 if total_rows else 0
+        conditional = (count / previous) * 100 if previous else 0
+        chain.append((joint, conditional))
+        previous = count
+    return chain
+
+# Lazy, read-only view of the rows selected by the filters. Columns are sliced on first access and
+# the full frame is only materialized when a consumer needs every column (e.g. the data table).
+class FilteredView:
+    def __init__(self, df, rows=None):
+        self.df = df
+        self.rows = rows
+        self._columns = {}
+        self._frame = None
+
+    def __len__(self):
+        return len(self.df) if self.rows is None else len(self.rows)
+
+    @property
+    def empty(self):
+        return len(self) == 0
+
+    @property
+    def columns(self):
+        return self.df.columns
+
+    def __getitem__(self, column):
+        series = self._columns.get(column)
+        if series is None:
+            series = self.df[column] if self.rows is None else self.df[column].iloc[self.rows]
+            self._columns[column] = series
+        return series
+
+    def frame(self):
+        if self._frame is None:
+            self._frame = self.df if self.rows is None else self.df.iloc[self.rows]
+        return self._frame
@@ -0,0 +1,43 @@
+import numpy as np
+
+# Histogram binning for the chart grid and the PDF report. Bin edges follow the Freedman-Diaconis
+# rule and the counts come from the numeric edges, so nothing is written back to the frame and no
+# string labels are built or parsed to find the bins. Everything here works on the sorted non-NaN
+# values of a column, which column_summary sorts once and shares with the metrics.
+
+# Function to get the sorted non-NaN values of a column and its row count (NaN included)
+def sorted_valid_values(values):
+    if hasattr(values, 'to_numpy'):
+        values = values.to_numpy(dtype=np.float64, na_value=np.nan)
+    values = np.asarray(values, dtype=np.float64)
+    # Boolean indexing returns a copy, so it can be sorted in place
+    valid = values[~np.isnan(values)]
+    valid.sort()
+    return valid, len(values)
+
+# Function to get a percentile of sorted values (linear interpolation, same as np.percentile)
+def sorted_percentile(valid, q):
+    position = (len(valid) - 1) * q / 100
+    lower = int(np.floor(position))
+    upper = min(lower + 1, len(valid) - 1)
+    return valid[lower] + (valid[upper] - valid[lower]) * (position - lower)
+
+# Function to get the Freedman-Diaconis bin edges of a column (None if the data is constant or empty).
+# n is the row count of the column, NaN included, as in the original chart code.
+def freedman_diaconis_edges(low, high, q1, q3, n):
+    data_range = high - low
+    if not data_range > 0:
+        return None
+    bin_width = 2 * (q3 - q1) * (n ** (-1/3))
+    if bin_width == 0:
+        bin_width = data_range / 10
+
+    num_bins = max(1, int(np.ceil(data_range / bin_width)))
+    return np.linspace(low, high, num_bins + 1)
+
+# Function to count sorted values per bin: [a, b) bins with the last one closed, as np.histogram does
+def histogram_counts(valid, edges):
+    positions = np.searchsorted(valid, edges, side='left')
+    positions[-1] = np.searchsorted(valid, edges[-1], side='right')
+    return np.diff(positions)
+
@@ -0,0 +1,56 @@
+import numpy as np
+from .histograms import sorted_valid_values
+
+# Trade metrics shown in the "Metrics" panel and the PDF report. Everything is derived from one
+# sorted copy of the non-NaN values: wins and win/loss totals from the position of zero, median
+# and mode from the sorted order, and the standard deviation from one pass over the deviations.
+
+# Function to compute the metrics of a numeric column (win rate is over all rows, NaN included)
+def compute_metrics(values):
+    return metrics_from_sorted(*sorted_valid_values(values))
+
+# Function to compute the metrics from the sorted non-NaN values and the row count of a column
+def metrics_from_sorted(valid, total_elements):
+    n = len(valid)
+
+    # Values below the first zero are losses, values after the last zero are wins
+    loss_end = np.searchsorted(valid, 0, side='left')
+    win_start = np.searchsorted(valid, 0, side='right')
+    wins = n - win_start
+    total_win = valid[win_start:].sum()
+    total_loss = valid[:loss_end].sum()
+    net_win = total_win + total_loss
+
+    if n:
+        avg_r = net_win / n
+        mid = n // 2
+        median_r = valid[mid] if n % 2 else (valid[mid - 1] + valid[mid]) / 2
+        # Mode: longest run of equal values, the smallest value wins ties (same as Series.mode().iloc[0])
+        run_starts = np.concatenate(([0], np.flatnonzero(valid[1:] != valid[:-1]) + 1))
+        run_lengths = np.diff(np.append(run_starts, n))
+        mode_r = valid[run_starts[np.argmax(run_lengths)]]
+    else:
+        avg_r = np.nan
+        median_r = np.nan
+        mode_r = 0
+
+    if n > 1:
+        deviations = valid - avg_r
+        std_dev = np.sqrt(np.dot(deviations, deviations) / (n - 1))
+    else:
+        std_dev = np.nan
+
+    # SQN calculation
+    sqn = (avg_r / std_dev) * np.sqrt(total_elements) if std_dev != 0 else 0
+
+    return {
+        'win_rate': (wins / total_elements) * 100 if total_elements else 0,
+        'net_win': net_win,
+        'total_win': total_win,
+        'total_loss': total_loss,
+        'sqn': sqn,
+        'std_dev': std_dev,
+        'median_r': median_r,
+        'mode_r': mode_r,
+        'avg_r': avg_r,
+    }
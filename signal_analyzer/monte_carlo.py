@@ -0,0 +1,166 @@
+import multiprocessing
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+# Monte Carlo engine for the "Monte Carlo Analysis" tab. It lives outside the Streamlit script
+# so the process pool workers can import it by module path. scipy is only imported by the
+# parametric distributions.
+
+# Function to fit the distribution the Monte Carlo steps are drawn from
+def fit_monte_carlo_distribution(column_data, dist_type):
+    if dist_type == 'Gaussian Normal':
+        from scipy.stats import norm
+        # Fit Gaussian distribution to the data
+        return norm.fit(column_data)
+    elif dist_type == 'Student T':
+        from scipy.stats import t
+        # Fit Student's T distribution to the data
+        return t.fit(column_data)
+    # Raw Data: bootstrap sampling from the actual data
+    return np.asarray(column_data)
+
+# Function to draw a (simulations x steps) matrix of percentage returns
+def draw_monte_carlo_steps(dist_params, dist_type, num_simulations, num_steps, rng):
+    size = (num_simulations, num_steps)
+    if dist_type == 'Gaussian Normal':
+        mu, sigma = dist_params
+        return rng.normal(mu, sigma, size=size)
+    elif dist_type == 'Student T':
+        from scipy.stats import t
+        df_t, loc, scale = dist_params
+        return t.rvs(df=df_t, loc=loc, scale=scale, size=size, random_state=rng)
+    return rng.choice(dist_params, size=size)
+
+# Function to compound percentage returns into equity trajectories (one row per simulation)
+def compound_trajectories(steps, initial_value, dtype=np.float64):
+    # Column 0 is the initial value, the rest is the compounded equity
+    trajectories = np.empty((steps.shape[0], steps.shape[1] + 1), dtype=dtype)
+    trajectories[:, 0] = initial_value
+    growth = steps.astype(dtype, copy=False)
+    growth /= 100
+    growth += 1
+    np.cumprod(growth, axis=1, out=trajectories[:, 1:])
+    trajectories[:, 1:] *= initial_value
+    return trajectories
+
+# Function to create the generators for a run: one independent stream per worker, spawned from the seed
+def spawn_generators(seed, num_workers):
+    return [np.random.default_rng(child) for child in np.random.SeedSequence(seed).spawn(num_workers)]
+
+# Function to run the Monte Carlo simulation as one batched (simulations x steps) draw
+def simulate_monte_carlo(column_data, num_simulations, num_steps, initial_value, dist_type, dtype=np.float64, seed=None):
+    rng = spawn_generators(seed, 1)[0]
+    dist_params = fit_monte_carlo_distribution(column_data, dist_type)
+    steps = draw_monte_carlo_steps(dist_params, dist_type, num_simulations, num_steps, rng)
+    return compound_trajectories(steps, initial_value, dtype)
+
+# Function to reduce a full trajectory matrix to the per-step statistics shown in the Monte Carlo tab
+def summarize_trajectories(trajectories, percentiles=(), sample_size=100):
+    return {
+        'mean': trajectories.mean(axis=0),
+        'min': trajectories.min(axis=0),
+        'max': trajectories.max(axis=0),
+        'percentiles': {p: np.percentile(trajectories, p, axis=0) for p in percentiles},
+        'sample': trajectories[:sample_size],
+    }
+
+# Function to keep a uniform random sample of trajectories across chunks (reservoir sampling)
+def update_trajectory_reservoir(reservoir, chunk, seen, rng):
+    capacity = len(reservoir)
+    # Fill the empty slots first, then replace slot j with probability capacity / (position + 1)
+    fill = min(max(capacity - seen, 0), len(chunk))
+    reservoir[seen:seen + fill] = chunk[:fill]
+    if fill < len(chunk):
+        positions = np.arange(seen + fill, seen + len(chunk))
+        slots = rng.integers(0, positions + 1)
+        keep = slots < capacity
+        reservoir[slots[keep]] = chunk[fill:][keep]
+
+# Function to run one share of the simulations in fixed-size chunks and return its partial aggregates
+def run_monte_carlo_chunks(dist_params, dist_type, num_simulations, num_steps, initial_value, rng,
+                           chunk_size=10000, sample_size=5000, dtype=np.float64):
+    total = np.zeros(num_steps + 1)
+    min_trajectory = np.full(num_steps + 1, np.inf)
+    max_trajectory = np.full(num_steps + 1, -np.inf)
+    reservoir = np.empty((min(sample_size, num_simulations), num_steps + 1), dtype=dtype)
+
+    seen = 0
+    while seen < num_simulations:
+        n = min(chunk_size, num_simulations - seen)
+        steps = draw_monte_carlo_steps(dist_params, dist_type, n, num_steps, rng)
+        chunk = compound_trajectories(steps, initial_value, dtype)
+        total += chunk.sum(axis=0)
+        np.minimum(min_trajectory, chunk.min(axis=0), out=min_trajectory)
+        np.maximum(max_trajectory, chunk.max(axis=0), out=max_trajectory)
+        update_trajectory_reservoir(reservoir, chunk, seen, rng)
+        seen += n
+
+    return {
+        'count': num_simulations,
+        'total': total,
+        'min': min_trajectory,
+        'max': max_trajectory,
+        'sample': reservoir,
+    }
+
+# Function to merge partial aggregates (in worker order, so the result is deterministic)
+def merge_monte_carlo_partials(partials, percentiles=(), sample_size=5000):
+    count = sum(partial['count'] for partial in partials)
+    total = np.zeros_like(partials[0]['total'])
+    min_trajectory = partials[0]['min'].copy()
+    max_trajectory = partials[0]['max'].copy()
+    for partial in partials:
+        total += partial['total']
+        np.minimum(min_trajectory, partial['min'], out=min_trajectory)
+        np.maximum(max_trajectory, partial['max'], out=max_trajectory)
+
+    # Simulations are i.i.d., so taking the worker samples in order still gives a uniform sample
+    sample = np.concatenate([partial['sample'] for partial in partials])[:min(sample_size, count)]
+
+    return {
+        'mean': total / count,
+        'min': min_trajectory,
+        'max': max_trajectory,
+        'percentiles': {p: np.percentile(sample, p, axis=0) for p in percentiles},
+        'sample': sample,
+    }
+
+# Function to split the simulations as evenly as possible across workers
+def split_simulations(num_simulations, num_workers):
+    base, remainder = divmod(num_simulations, num_workers)
+    return [base + (1 if i < remainder else 0) for i in range(num_workers)]
+
+# Function to run the Monte Carlo simulation in fixed-size chunks, keeping only running per-step aggregates.
+# Peak memory is bounded by chunk_size and sample_size; percentiles are exact up to sample_size
+# simulations and estimated from the uniform sample beyond that.
+def simulate_monte_carlo_streaming(column_data, num_simulations, num_steps, initial_value, dist_type,
+                                   percentiles=(), chunk_size=10000, sample_size=5000, dtype=np.float64, seed=None):
+    rng = spawn_generators(seed, 1)[0]
+    dist_params = fit_monte_carlo_distribution(column_data, dist_type)
+    partial = run_monte_carlo_chunks(dist_params, dist_type, num_simulations, num_steps, initial_value, rng,
+                                     chunk_size, sample_size, dtype)
+    return merge_monte_carlo_partials([partial], percentiles, sample_size)
+
+# Function to run the streaming simulation across a process pool. Each worker gets its own
+# SeedSequence-spawned generator, so a given (seed, num_workers) pair is bit-reproducible.
+def simulate_monte_carlo_parallel(column_data, num_simulations, num_steps, initial_value, dist_type, num_workers,
+                                  percentiles=(), chunk_size=10000, sample_size=5000, dtype=np.float64, seed=None):
+    num_workers = max(1, min(num_workers, num_simulations))
+    dist_params = fit_monte_carlo_distribution(column_data, dist_type)
+    rngs = spawn_generators(seed, num_workers)
+    shares = split_simulations(num_simulations, num_workers)
+
+    if num_workers == 1:
+        partials = [run_monte_carlo_chunks(dist_params, dist_type, shares[0], num_steps, initial_value, rngs[0],
+                                           chunk_size, sample_size, dtype)]
+    else:
+        # Spawned workers: forking the multi-threaded Streamlit server could copy a lock held by another thread
+        with ProcessPoolExecutor(max_workers=num_workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+            futures = [
+                executor.submit(run_monte_carlo_chunks, dist_params, dist_type, share, num_steps, initial_value, rng,
+                                chunk_size, sample_size, dtype)
+                for share, rng in zip(shares, rngs)
+            ]
+            partials = [future.result() for future in futures]
+
+    return merge_monte_carlo_partials(partials, percentiles, sample_size)
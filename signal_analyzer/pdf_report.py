@@ -0,0 +1,186 @@
+import io
+from xml.sax.saxutils import escape
+from .filters import FILTER_LETTERS, describe_filter, probability_chain
+from .report_charts import DEFAULT_CHART_DPI, draw_histograms, render_histograms
+
+# PDF report of the Signal Analyzer. The builder only takes plain values (row counts, metrics dicts and
+# the column summaries of the report columns) and returns the PDF bytes, so it has no Streamlit or frame
+# dependency and can run outside the script thread (see report_jobs).
+
+# Function to build the PDF report; returns (pdf bytes, warnings).
+# chart_columns must be numeric columns with an entry in column_summaries; filter_specs and
+# filter_counts are the filters and per-filter row counts of filters.evaluate_filters, listed one row
+# per filter with their probability chain; progress, if given, is called as progress(fraction, message)
+# while the report is built.
+def build_pdf_report(total_rows, filtered_rows, metrics_data1, metrics_data2, selected_column1, selected_column2,
+                     chart_columns, column_summaries, filter_specs=(), filter_counts=(), chart_dpi=DEFAULT_CHART_DPI,
+                     chart_workers=None, chart_format='png', progress=None):
+    # reportlab is only imported when a report is built
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image as RLImage, PageBreak
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    
+    progress = progress or (lambda fraction, message: None)
+    warnings = []
+    
+    progress(0.0, 'Initializing PDF document...')
+    # Create the PDF document with A4 size, in memory
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4)
+    styles = getSampleStyleSheet()
+    elements = []
+    
+    progress(0.05, 'Adding title...')
+    # Add title
+    title_style = ParagraphStyle(
+        'CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=20,  # Reduced font size for A4
+        spaceAfter=20,
+        alignment=1  # Center alignment
+    )
+    elements.append(Paragraph("Signal Analyzer Report", title_style))
+    
+    progress(0.1, 'Creating filter information table...')
+    # Create a table for filter information: the records left, then one row per filter with its
+    # joint probability P(A), P(B)... and its probability given the filters before it
+    cell_style = ParagraphStyle('FilterCell', parent=styles['Normal'], fontName='Helvetica', fontSize=10)
+    filter_data = [
+        ["Filter Information", "", "", ""],
+        ["Total Records", f"{filtered_rows} of {total_rows}", "", ""],
+    ]
+    for i, (spec, (joint, conditional)) in enumerate(zip(filter_specs, probability_chain(filter_counts, total_rows))):
+        letter = FILTER_LETTERS[i]
+        given = f"P({letter}|{','.join(FILTER_LETTERS[:i])}): {conditional:.2f}%" if i else ""
+        filter_data.append([f"Filter {letter}", Paragraph(escape(describe_filter(spec)), cell_style),
+                            f"P({letter}): {joint:.2f}%", given])
+    
+    filter_table = Table(filter_data, colWidths=[80, 151, 80, 140])  # Adjusted widths for A4
+    filter_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 12),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),
+        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 1), (-1, -1), 10),
+        ('TOPPADDING', (0, 1), (-1, -1), 6),
+        ('BOTTOMPADDING', (0, 1), (-1, -1), 6),
+        ('VALIGN', (0, 1), (-1, -1), 'MIDDLE'),
+        ('SPAN', (0, 0), (-1, 0)),
+        ('SPAN', (1, 1), (-1, 1)),
+    ]))
+    elements.append(filter_table)
+    elements.append(Spacer(1, 20))
+    
+    progress(0.15, 'Adding metrics tables...')
+    # Add metrics tables side by side
+    if metrics_data1 and metrics_data2:
+        # Create data for both tables
+        metrics_table_data1 = [
+            [Paragraph(f"Metrics for {selected_column1}", styles['Heading3']), ""],
+            ["Win Rate", f"{metrics_data1['win_rate']:.2f}%"],
+            ["Net Win", f"{metrics_data1['net_win']:.2f} R"],
+            ["Total Win", f"{metrics_data1['total_win']:.2f} R"],
+            ["Total Loss", f"{metrics_data1['total_loss']:.2f} R"],
+            ["SQN", f"{metrics_data1['sqn']:.2f}"],
+            ["StdDev", f"{metrics_data1['std_dev']:.2f}"],
+            ["Median R", f"{metrics_data1['median_r']:.2f}"],
+            ["Mode", f"{metrics_data1['mode_r']:.2f}"],
+            ["Avrg R", f"{metrics_data1['avg_r']:.2f}"]
+        ]
+        
+        metrics_table_data2 = [
+            [Paragraph(f"Metrics for {selected_column2}", styles['Heading3']), ""],
+            ["Win Rate", f"{metrics_data2['win_rate']:.2f}%"],
+            ["Net Win", f"{metrics_data2['net_win']:.2f} R"],
+            ["Total Win", f"{metrics_data2['total_win']:.2f} R"],
+            ["Total Loss", f"{metrics_data2['total_loss']:.2f} R"],
+            ["SQN", f"{metrics_data2['sqn']:.2f}"],
+            ["StdDev", f"{metrics_data2['std_dev']:.2f}"],
+            ["Median R", f"{metrics_data2['median_r']:.2f}"],
+            ["Mode", f"{metrics_data2['mode_r']:.2f}"],
+            ["Avrg R", f"{metrics_data2['avg_r']:.2f}"]
+        ]
+        
+        # Create tables
+        table_style = TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 10),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+            ('FONTSIZE', (0, 1), (-1, -1), 9),
+        ])
+        
+        table1 = Table(metrics_table_data1, colWidths=[120, 80])  # Adjusted widths for A4
+        table1.setStyle(table_style)
+        table2 = Table(metrics_table_data2, colWidths=[120, 80])  # Adjusted widths for A4
+        table2.setStyle(table_style)
+        
+        # Create a table to hold both metrics tables side by side
+        combined_table = Table([[table1, table2]], colWidths=[250, 250])  # Adjusted widths for A4
+        combined_table.setStyle(TableStyle([
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+        ]))
+        elements.append(combined_table)
+    
+    progress(0.2, 'Adding page break...')
+    # Add page break before histograms
+    elements.append(PageBreak())
+    
+    progress(0.2, 'Adding histograms title...')
+    # Add histograms title
+    elements.append(Paragraph("Histograms", title_style))
+    elements.append(Spacer(1, 20))
+    
+    progress(0.2, 'Generating histograms...')
+    # Draw every histogram up front (raster charts in parallel worker processes), then lay them out 2 per row
+    chart_summaries = {column: column_summaries[column] for column in chart_columns}
+    chart_progress = lambda done, total: progress(0.2 + 0.7 * done / total, f'Generated {done} of {total} histograms...')
+    if chart_format == 'vector':
+        chart_images = draw_histograms(chart_summaries, width=250, height=150, progress=chart_progress)
+    else:
+        chart_images = render_histograms(chart_summaries, dpi=chart_dpi, num_workers=chart_workers, progress=chart_progress)
+    for i in range(0, len(chart_columns), 2):
+        hist_row = []
+        for column in chart_columns[i:i + 2]:
+            chart, error = chart_images[column]
+            if error is not None:
+                warnings.append(f"Error generating histogram for {column}: {str(error)}")
+                continue
+            if chart_format == 'vector':
+                hist_row.append(chart)
+            else:
+                # PNG bytes go straight into ReportLab, with size adjusted for A4
+                hist_row.append(RLImage(io.BytesIO(chart), width=250, height=150))
+        
+        if hist_row:
+            # Add spacer if only one histogram in row
+            if len(hist_row) == 1:
+                hist_row.append(Spacer(250, 150))
+            
+            # Create table for histogram row
+            hist_table = Table([hist_row], colWidths=[250, 250])  # Adjusted widths for A4
+            hist_table.setStyle(TableStyle([
+                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ]))
+            elements.append(hist_table)
+            elements.append(Spacer(1, 20))
+    
+    progress(0.9, 'Building PDF...')
+    # Build PDF
+    doc.build(elements)
+    progress(1.0, 'PDF generation completed!')
+    
+    return buffer.getvalue(), warnings
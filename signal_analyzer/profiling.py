@@ -0,0 +1,96 @@
+import io
+import json
+import time
+import uuid
+from contextlib import contextmanager
+
+# Opt-in timing spans for one run of the app (or any other caller). Each span records its name,
+# start offset and duration, nesting depth and, optionally, the rows and bytes it processed.
+# A disabled profile records nothing, so the spans can stay in the code at the cost of a function
+# call. A single run can also be captured with cProfile, or with pyinstrument if it is installed.
+
+class RunProfile:
+    def __init__(self, enabled=False, label=None):
+        self.enabled = enabled
+        self.label = label
+        self.run_id = uuid.uuid4().hex[:12]
+        self.started_at = time.time()
+        self.spans = []
+        self.capture_report = None
+        self._start = time.perf_counter()
+        self._depth = 0
+        self._capture = None
+
+    # Open a span by hand (for blocks too long to wrap in a with statement); returns its record
+    def begin(self, name, rows=None, nbytes=None):
+        record = {'name': name, 'start_ms': None, 'duration_ms': None, 'depth': self._depth, 'rows': rows, 'bytes': nbytes}
+        if self.enabled:
+            record['start_ms'] = (time.perf_counter() - self._start) * 1000
+            self._depth += 1
+            self.spans.append(record)
+        return record
+
+    def end(self, record):
+        if self.enabled and record['duration_ms'] is None:
+            record['duration_ms'] = (time.perf_counter() - self._start) * 1000 - record['start_ms']
+            self._depth -= 1
+        return record
+
+    # Time the body of a with statement; rows and bytes can also be set on the yielded record
+    @contextmanager
+    def span(self, name, rows=None, nbytes=None):
+        record = self.begin(name, rows, nbytes)
+        try:
+            yield record
+        finally:
+            self.end(record)
+
+    def elapsed_ms(self):
+        return (time.perf_counter() - self._start) * 1000
+
+    # Start a call-level capture of the run: 'cprofile' or 'pyinstrument' (falls back to cProfile)
+    def start_capture(self, tool='cprofile'):
+        if tool == 'pyinstrument':
+            try:
+                from pyinstrument import Profiler
+                self._capture = ('pyinstrument', Profiler())
+                self._capture[1].start()
+                return
+            except ImportError:
+                pass
+        import cProfile
+        self._capture = ('cprofile', cProfile.Profile())
+        self._capture[1].enable()
+
+    # Stop the capture and keep its text report (top entries by cumulative time for cProfile)
+    def stop_capture(self, limit=40):
+        if self._capture is None:
+            return None
+        tool, profiler = self._capture
+        self._capture = None
+        if tool == 'pyinstrument':
+            profiler.stop()
+            self.capture_report = profiler.output_text(unicode=False, color=False)
+        else:
+            import pstats
+            profiler.disable()
+            out = io.StringIO()
+            pstats.Stats(profiler, stream=out).sort_stats('cumulative').print_stats(limit)
+            self.capture_report = out.getvalue()
+        return self.capture_report
+
+    # Spans as JSON lines, one object per span tagged with the run id, label and wall-clock start
+    def to_jsonl(self):
+        lines = []
+        for record in self.spans:
+            lines.append(json.dumps({
+                'run_id': self.run_id,
+                'label': self.label,
+                'run_started_at': self.started_at,
+                **record,
+            }, default=str))
+        return '\n'.join(lines) + '\n' if lines else ''
+
+    def append_jsonl(self, path):
+        with open(path, 'a', encoding='utf-8') as log_file:
+            log_file.write(self.to_jsonl())
@@ -0,0 +1,138 @@
+import io
+import os
+import multiprocessing
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# Histogram images for the PDF report. Charts are drawn from the precomputed bins of the column
+# summaries on the Agg canvas (no pyplot state, so it is safe in worker processes and threads) and
+# come back as PNG bytes that go straight into ReportLab. histogram_drawing is the vector
+# alternative: native ReportLab graphics that stay sharp at any zoom and cost a few KB per chart.
+# matplotlib and reportlab are only imported by the functions that draw with them.
+
+DEFAULT_CHART_DPI = 150
+
+# Below this many charts the pool start-up costs more than it saves
+MIN_PARALLEL_CHARTS = 4
+
+# Function to pick the histogram bars of a column summary: (left edges, counts, widths)
+def histogram_bars(summary):
+    if summary['edges'] is not None:
+        return summary['edges'][:-1], summary['counts'], np.diff(summary['edges'])
+    if summary['count']:
+        # Constant data: a single bar around the value
+        return np.array([summary['min'] - 0.5]), np.array([summary['count']]), np.array([1.0])
+    return np.empty(0), np.empty(0), np.empty(0)
+
+# Function to render one histogram as PNG bytes
+def render_histogram_png(column, left_edges, counts, widths, dpi=DEFAULT_CHART_DPI):
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    fig = Figure(figsize=(6, 3))  # Adjusted size for A4
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    ax.bar(left_edges, counts, width=widths, align='edge', edgecolor='black')
+    ax.set_title(f'Distribution of "{column}"', fontsize=10)
+    ax.set_xlabel('Value', fontsize=8)
+    ax.set_ylabel('Frequency', fontsize=8)
+    ax.tick_params(labelsize=7)
+
+    buf = io.BytesIO()
+    fig.savefig(buf, format='png', bbox_inches='tight', dpi=dpi)
+    return buf.getvalue()
+
+# Function to draw one histogram as a ReportLab vector drawing of width x height points
+def histogram_drawing(column, left_edges, counts, widths, width=250, height=150):
+    from reportlab.lib import colors
+    from reportlab.graphics.shapes import Drawing, Group, Rect, String
+    from reportlab.graphics.charts.axes import XValueAxis, YValueAxis
+
+    drawing = Drawing(width, height)
+    # Plot area, leaving room for the title and the axis labels
+    plot_x, plot_y = 36, 28
+    plot_width, plot_height = width - plot_x - 8, height - plot_y - 20
+
+    if len(counts):
+        low, high = left_edges[0], left_edges[-1] + widths[-1]
+        top = max(counts.max(), 1)
+    else:
+        low, high, top = 0, 1, 1
+
+    x_axis = XValueAxis()
+    x_axis.setPosition(plot_x, plot_y, plot_width)
+    x_axis.valueMin, x_axis.valueMax = float(low), float(high)
+    x_axis.maximumTicks = 7
+    x_axis.labels.fontName = 'Helvetica'
+    x_axis.labels.fontSize = 6
+    x_axis.labelTextFormat = '%g'
+    x_axis.configure([(float(low), float(high))])
+
+    y_axis = YValueAxis()
+    y_axis.setPosition(plot_x, plot_y, plot_height)
+    y_axis.valueMin, y_axis.valueMax = 0, float(top)
+    y_axis.maximumTicks = 5
+    y_axis.labels.fontName = 'Helvetica'
+    y_axis.labels.fontSize = 6
+    y_axis.labelTextFormat = '%g'
+    y_axis.configure([(0, float(top))])
+
+    for left, count, bar_width in zip(left_edges, counts, widths):
+        x0, x1 = x_axis.scale(left), x_axis.scale(left + bar_width)
+        drawing.add(Rect(x0, plot_y, x1 - x0, y_axis.scale(count) - plot_y,
+                         fillColor=colors.HexColor('#1f77b4'), strokeColor=colors.black, strokeWidth=0.3))
+
+    drawing.add(x_axis)
+    drawing.add(y_axis)
+    drawing.add(String(plot_x + plot_width / 2, height - 12, f'Distribution of "{column}"',
+                       fontName='Helvetica', fontSize=8, textAnchor='middle'))
+    drawing.add(String(plot_x + plot_width / 2, 4, 'Value', fontName='Helvetica', fontSize=6, textAnchor='middle'))
+    # Rotated y label
+    drawing.add(Group(String(0, 0, 'Frequency', fontName='Helvetica', fontSize=6, textAnchor='middle'),
+                      transform=(0, 1, -1, 0, 8, plot_y + plot_height / 2)))
+    return drawing
+
+# Function to draw the histograms of many columns as vector drawings (cheap, so no process pool)
+def draw_histograms(column_summaries, width=250, height=150, progress=None):
+    results = {}
+    for column, summary in column_summaries.items():
+        try:
+            results[column] = (histogram_drawing(column, *histogram_bars(summary), width=width, height=height), None)
+        except Exception as e:
+            results[column] = (None, e)
+        if progress:
+            progress(len(results), len(column_summaries))
+    return results
+
+# Function to get the default number of rendering workers
+def default_chart_workers():
+    return max(1, min(8, os.cpu_count() or 1))
+
+# Function to render the histograms of many columns, across a process pool when there are enough of them.
+# Only the bins are sent to the workers. Returns {column: (png bytes, None)} or (None, error) per column;
+# progress, if given, is called as progress(done, total) as charts finish.
+def render_histograms(column_summaries, dpi=DEFAULT_CHART_DPI, num_workers=None, progress=None):
+    num_workers = default_chart_workers() if num_workers is None else max(1, num_workers)
+    jobs = {column: histogram_bars(summary) for column, summary in column_summaries.items()}
+    results = {}
+    if num_workers == 1 or len(jobs) < MIN_PARALLEL_CHARTS:
+        for column, bars in jobs.items():
+            try:
+                results[column] = (render_histogram_png(column, *bars, dpi=dpi), None)
+            except Exception as e:
+                results[column] = (None, e)
+            if progress:
+                progress(len(results), len(jobs))
+        return results
+
+    # Spawned workers: reports are built on a job thread of the server, which must not be forked
+    with ProcessPoolExecutor(max_workers=min(num_workers, len(jobs)), mp_context=multiprocessing.get_context('spawn')) as executor:
+        futures = {executor.submit(render_histogram_png, column, *bars, dpi=dpi): column for column, bars in jobs.items()}
+        for future in as_completed(futures):
+            try:
+                results[futures[future]] = (future.result(), None)
+            except Exception as e:
+                results[futures[future]] = (None, e)
+            if progress:
+                progress(len(results), len(jobs))
+    return results
@@ -0,0 +1,67 @@
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# Background PDF report jobs. A report is built on a worker thread of the server process, so it keeps
+# going when the script reruns (any widget interaction) and the next run just picks up its progress.
+# Jobs are keyed on everything the report depends on; a finished job stays in the registry as the
+# cached result, so asking again for an unchanged report returns the same bytes without rebuilding.
+
+class ReportJob:
+    def __init__(self, key):
+        self.key = key
+        self.progress = 0.0
+        self.message = 'Queued...'
+        self.result = None
+        self.warnings = []
+        self.error = None
+        self.done = threading.Event()
+
+    def update(self, fraction, message):
+        self.progress = min(max(fraction, 0.0), 1.0)
+        self.message = message
+
+    @property
+    def finished(self):
+        return self.done.is_set()
+
+class ReportJobs:
+    def __init__(self, max_workers=2, max_results=16):
+        self.max_results = max_results
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='pdf-report')
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    # Start building a report, or get the running or finished job with the same key.
+    # build is called on a worker thread as build(progress) and returns (pdf bytes, warnings).
+    def submit(self, key, build):
+        with self._lock:
+            job = self._jobs.get(key)
+            # Failed jobs are retried, anything else is reused
+            if job is not None and job.error is None:
+                self._jobs.move_to_end(key)
+                return job
+            job = self._jobs[key] = ReportJob(key)
+            self._evict()
+        self._executor.submit(self._run, job, build)
+        return job
+
+    def get(self, key):
+        with self._lock:
+            return self._jobs.get(key)
+
+    def _run(self, job, build):
+        try:
+            job.result, job.warnings = build(job.update)
+        except Exception as e:
+            job.error = e
+        finally:
+            job.done.set()
+
+    # Drop the oldest finished jobs beyond max_results; running jobs are never dropped
+    def _evict(self):
+        finished = [key for key, job in self._jobs.items() if job.finished]
+        for key in finished[:max(0, len(self._jobs) - self.max_results)]:
+            del self._jobs[key]
+
+report_jobs = ReportJobs()
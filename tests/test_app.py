@@ -0,0 +1,46 @@
+import io
+import os
+import numpy as np
+import pandas as pd
+from streamlit.testing.v1 import AppTest
+from signal_analyzer.data_loader import content_digest
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'FilteredData_v19.py')
+
+# Function to start the app with an uploaded signal table (Parquet, which gets no sidecar)
+def make_app(n_rows=500):
+    rng = np.random.default_rng(0)
+    buffer = io.BytesIO()
+    pd.DataFrame({
+        'R': rng.normal(0.2, 2, n_rows).round(2),
+        'R2': rng.normal(0.1, 1, n_rows),
+        'Symbol': rng.choice(['AAA', 'BBB', 'CCC'], n_rows),
+    }).to_parquet(buffer, index=False)
+    data = buffer.getvalue()
+    at = AppTest.from_file(APP_PATH, default_timeout=120)
+    at.session_state['file_name'] = 'signals.parquet'
+    at.session_state['file_data'] = data
+    at.session_state['file_digest'] = content_digest(data)
+    at.session_state['file_id'] = 'signals'
+    return at
+
+# Function to get the Monte Carlo statistics shown on the page
+def monte_carlo_metrics(at):
+    return {metric.label: metric.value for metric in at.metric}
+
+def test_monte_carlo_results_survive_a_rerun():
+    at = make_app()
+    at.run()
+    assert not at.exception
+    next(button for button in at.button if button.label == 'Run Monte Carlo Simulation').click().run()
+    shown = monte_carlo_metrics(at)
+    assert 'Maximum Drawdown' in shown
+
+    # A rerun without the click (e.g. the poll of a running PDF job) must keep the results
+    at.run()
+    assert not at.exception
+    assert monte_carlo_metrics(at) == shown
+
+    # Results of other settings are not shown
+    next(box for box in at.number_input if box.label == 'Seed').set_value(7).run()
+    assert 'Maximum Drawdown' not in monte_carlo_metrics(at)
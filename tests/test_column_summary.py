@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+import pytest
+from signal_analyzer.column_summary import compute_column_summaries, compute_column_summary
+
+# Function to assert that two summaries are equal (NaN equal to NaN)
+def assert_same_summary(summary, expected):
+    assert summary.keys() == expected.keys()
+    for key, value in expected.items():
+        if key == 'metrics':
+            for metric, metric_value in value.items():
+                np.testing.assert_allclose(summary[key][metric], metric_value, rtol=1e-12, equal_nan=True, err_msg=metric)
+        elif value is None:
+            assert summary[key] is None, key
+        else:
+            np.testing.assert_allclose(summary[key], value, rtol=1e-12, equal_nan=True, err_msg=key)
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(2)
+    n = 500
+    df = pd.DataFrame({
+        'R': rng.normal(0.1, 1.0, n),
+        'Score': rng.uniform(0, 100, n),
+        'Count': rng.integers(-5, 6, n),
+        'Flag': rng.random(n) > 0.5,
+        'Constant': np.full(n, 3.0),
+        'Empty': np.full(n, np.nan),
+    })
+    df.loc[rng.integers(0, n, 40), 'R'] = np.nan
+    return df
+
+@pytest.mark.parametrize('rows', [None, 'filtered', 'none'])
+def test_batch_summaries_match_single_column(frame, rows):
+    if rows == 'filtered':
+        rows = np.flatnonzero(frame['Score'].to_numpy() > 30)
+    elif rows == 'none':
+        rows = np.empty(0, dtype=np.intp)
+    columns = list(frame.columns)
+    summaries = compute_column_summaries(frame, columns, rows, block_bytes=4 * 8 * len(frame))
+    for column in columns:
+        values = frame[column] if rows is None else frame[column].iloc[rows]
+        assert_same_summary(summaries[column], compute_column_summary(values))
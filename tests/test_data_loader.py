@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+from signal_analyzer.data_loader import FrameCache, compact_dataframe, load_dataframe
+from signal_analyzer.filters import evaluate_filters, range_filter
+from signal_analyzer.metrics import compute_metrics
+
+def test_compact_downcasts_only_lossless_columns():
+    df = pd.DataFrame({
+        'Count': np.arange(10, dtype=np.int64),
+        'Whole': [1.0, 2.0, np.nan, 4.0, 5.0, 6.0, 7.0, 8.0, 9.0, 10.0],
+        'R': np.linspace(0.1, 1.0, 10),
+        'Huge': [1e300] + [1.0] * 9,
+    })
+    compact = compact_dataframe(df.copy())
+    assert compact['Count'].dtype == np.int8
+    assert compact['Whole'].dtype == np.float32
+    assert compact['R'].dtype == np.float64
+    assert compact['Huge'].dtype == np.float64
+    for column in df.columns:
+        np.testing.assert_array_equal(compact[column].to_numpy(dtype=np.float64), df[column].to_numpy(dtype=np.float64))
+
+def test_compact_keeps_filters_and_metrics():
+    df = pd.DataFrame({'R': [0.1, 0.2, 0.3]})
+    compact = compact_dataframe(df.copy())
+    spec = [range_filter('R', 0.1, 0.3)]
+    assert evaluate_filters(compact, spec)[1] == evaluate_filters(df, spec)[1] == [3]
+    assert compute_metrics(compact['R']) == compute_metrics(df['R'])
+
+def test_upload_sidecars_follow_the_switch(tmp_path):
+    data = pd.DataFrame({'R': [0.5, -1.0, 2.0]}).to_csv(index=False).encode()
+    on_dir, off_dir = tmp_path / 'on', tmp_path / 'off'
+    first = load_dataframe('upload.csv', data=data, cache=FrameCache(1 << 30), sidecar_dir=str(on_dir))
+    assert len(list(on_dir.iterdir())) == 1
+    # A new process (empty frame cache) reads the sidecar written for the same bytes
+    again = load_dataframe('upload.csv', data=data, cache=FrameCache(1 << 30), sidecar_dir=str(on_dir))
+    pd.testing.assert_frame_equal(again, first)
+    load_dataframe('upload.csv', data=data, cache=FrameCache(1 << 30), sidecar_dir=str(off_dir), upload_sidecars=False)
+    assert not off_dir.exists()
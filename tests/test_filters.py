@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+import pytest
+from signal_analyzer.filters import ColumnIndex, evaluate_filters, probability_chain, range_filter, values_filter
+
+BOUND_FLAGS = [(True, True), (True, False), (False, True), (False, False)]
+
+@pytest.mark.parametrize('include_low, include_high', BOUND_FLAGS)
+def test_numeric_bounds_match_comparisons(include_low, include_high):
+    rng = np.random.default_rng(1)
+    values = np.round(rng.normal(0, 2, 2000), 1)
+    values[rng.integers(0, len(values), 100)] = np.nan
+    series = pd.Series(values)
+    index = ColumnIndex(series)
+    for low, high in [(-1.0, 1.0), (0.3, 0.3), (-10.0, 10.0), (2.0, -2.0), (0.05, 0.15)]:
+        expected = (series >= low if include_low else series > low) & (series <= high if include_high else series < high)
+        np.testing.assert_array_equal(index.mask(low, high, include_low, include_high), expected.to_numpy())
+
+@pytest.mark.parametrize('include_low, include_high', BOUND_FLAGS)
+def test_date_bounds_match_comparisons(include_low, include_high):
+    dates = pd.Series(pd.to_datetime(['2024-01-03', None, '2024-01-01', '2024-01-02', '2024-01-02', '2024-01-05']))
+    index = ColumnIndex(dates)
+    low, high = pd.Timestamp('2024-01-02'), pd.Timestamp('2024-01-03')
+    expected = (dates >= low if include_low else dates > low) & (dates <= high if include_high else dates < high)
+    np.testing.assert_array_equal(index.mask(low, high, include_low, include_high), expected.to_numpy())
+
+def test_evaluate_filters_counts_and_chain():
+    df = pd.DataFrame({
+        'R': [0.5, -1.0, 2.0, 3.0, np.nan, 1.0],
+        'Symbol': pd.Series(['A', 'B', 'A', 'C', 'A', None], dtype='category'),
+    })
+    specs = [range_filter('R', 0.0, 2.0), values_filter('Symbol', ['A']), None]
+    rows, counts = evaluate_filters(df, specs)
+    expected = (df['R'].between(0.0, 2.0) & (df['Symbol'] == 'A')).to_numpy()
+    np.testing.assert_array_equal(rows, np.flatnonzero(expected))
+    assert counts == [3, 2, 2]
+    assert probability_chain(counts, len(df)) == [(50.0, 50.0), (2 / 6 * 100, 2 / 3 * 100), (2 / 6 * 100, 100.0)]
+
+def test_category_mask_matches_isin():
+    series = pd.Series(['A', 'B', None, 'C', 'A', 'D'], dtype='category')
+    df = pd.DataFrame({'Symbol': series})
+    for values in (['A'], ['A', 'C'], ['Z'], ['B', 'Z']):
+        rows, counts = evaluate_filters(df, [values_filter('Symbol', values)])
+        expected = series.isin(values).to_numpy()
+        np.testing.assert_array_equal(rows, np.flatnonzero(expected))
+        assert counts == [int(expected.sum())]
@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+import pytest
+from signal_analyzer.metrics import compute_metrics
+
+# Function to compute the metrics with the pandas formulas of the original metrics panels
+def pandas_metrics(column):
+    total_elements = len(column)
+    wins = len(column[column > 0])
+    total_win = column[column > 0].sum()
+    total_loss = column[column < 0].sum()
+    std_dev = column.std()
+    avg_r = column.mean()
+    return {
+        'win_rate': (wins / total_elements) * 100 if total_elements else 0,
+        'net_win': total_win + total_loss,
+        'total_win': total_win,
+        'total_loss': total_loss,
+        'sqn': (avg_r / std_dev) * np.sqrt(total_elements) if std_dev != 0 else 0,
+        'std_dev': std_dev,
+        'median_r': column.median(),
+        'mode_r': column.mode().iloc[0] if not column.mode().empty else 0,
+        'avg_r': avg_r,
+    }
+
+COLUMNS = {
+    'float': pd.Series([1.5, -0.5, 0.0, 2.25, -1.0, 1.5, 3.0]),
+    'nan': pd.Series([1.0, np.nan, -2.0, 0.0, np.nan, 4.0, 4.0]),
+    'all_nan': pd.Series([np.nan, np.nan, np.nan]),
+    'empty': pd.Series([], dtype=np.float64),
+    'single': pd.Series([2.0]),
+    'constant': pd.Series([1.0, 1.0, 1.0, 1.0]),
+    'integer': pd.Series([3, -1, 0, 7, -4, 3, 2], dtype=np.int64),
+    'bool': pd.Series([True, False, True, True, False]),
+    'random': pd.Series(np.random.default_rng(0).normal(0.2, 1.5, 1000)),
+}
+
+@pytest.mark.parametrize('name', list(COLUMNS))
+def test_compute_metrics_matches_pandas(name):
+    column = COLUMNS[name]
+    expected = pandas_metrics(column)
+    metrics = compute_metrics(column)
+    assert metrics.keys() == expected.keys()
+    for metric, value in expected.items():
+        np.testing.assert_allclose(metrics[metric], value, rtol=1e-12, atol=1e-12, equal_nan=True, err_msg=metric)
@@ -0,0 +1,23 @@
+import numpy as np
+import pytest
+from signal_analyzer.monte_carlo import simulate_monte_carlo_parallel
+
+COLUMN = np.random.default_rng(3).normal(0.01, 0.5, 300)
+
+# Function to run a small parallel simulation
+def run(seed, num_workers, dist_type='Raw Data'):
+    return simulate_monte_carlo_parallel(COLUMN, 400, 20, 10000, dist_type, num_workers,
+                                         percentiles=(5, 50, 95), chunk_size=64, sample_size=100, seed=seed)
+
+@pytest.mark.parametrize('num_workers', [1, 2])
+@pytest.mark.parametrize('dist_type', ['Raw Data', 'Gaussian Normal'])
+def test_parallel_simulation_is_reproducible(num_workers, dist_type):
+    first = run(7, num_workers, dist_type)
+    second = run(7, num_workers, dist_type)
+    for key in ('mean', 'min', 'max', 'sample'):
+        np.testing.assert_array_equal(first[key], second[key])
+    for p in (5, 50, 95):
+        np.testing.assert_array_equal(first['percentiles'][p], second['percentiles'][p])
+
+def test_different_seeds_differ():
+    assert not np.array_equal(run(7, 2)['mean'], run(8, 2)['mean'])